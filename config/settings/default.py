@@ -5,7 +5,21 @@ CONFIG_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PROJECT_ROOT = os.path.dirname(CONFIG_ROOT)
 
 API_CACHE_SECONDS = 60 * 60 * 6
+API_STALE_SECONDS = 60 * 60 * 24 * 7
 API_CACHE_KEY = 5
+BALLOT_CACHE_SECONDS = 60 * 60 * 24 * 7
+REGISTRATION_LOCK_SECONDS = 30
+GLOSSARY_CACHE_SECONDS = 60 * 60 * 24 * 7
+HTML_PARSER = "lxml"
+
+MVIC_REQUESTS_PER_SECOND = 10
+MVIC_POOL_SIZE = 20
+MVIC_LOOKUP_CONCURRENCY = 4  # fewer than the gunicorn threads in Procfile
+MVIC_RETRY_COUNT = 3
+MVIC_RETRY_BACKOFF = 0.5
+MVIC_RETRY_BUDGET = 0.1
+MVIC_AMBIGUOUS_RETRY_COUNT = 2
+MVIC_LOOKUP_SECONDS = 20  # shorter than REGISTRATION_LOCK_SECONDS
 
 ###############################################################################
 # Core
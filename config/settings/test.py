@@ -5,6 +5,12 @@ from .default import *
 BASE_URL = "http://example.com"
 
 API_CACHE_SECONDS = 0
+API_STALE_SECONDS = 0
+BALLOT_CACHE_SECONDS = 0
+REGISTRATION_LOCK_SECONDS = 0
+GLOSSARY_CACHE_SECONDS = 0
+
+MVIC_REQUESTS_PER_SECOND = 0
 
 ###############################################################################
 # Core
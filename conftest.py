@@ -0,0 +1,12 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture
+def shared_cache(settings):
+    """Use an in-memory cache whose locks are atomic across threads."""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+    return cache
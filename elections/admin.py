@@ -69,10 +69,8 @@ class DistrictAdmin(admin.ModelAdmin):
 def delete_invalid_ballot_websites(modeladmin, request, queryset):
     count = 0
     for election in queryset:
-        websites = models.BallotWebsite.objects.filter(
-            mvic_election_id=election.mvic_id, valid=False
-        )
-        count += websites.delete()[0]
+        count += models.BallotWebsite.purge_invalid(election.mvic_id)
+    models.BallotHTML.purge_unreferenced()
     messages.info(request, f"Deleted {count} invalid ballot website(s)")
 
 
@@ -122,7 +120,7 @@ def parse_selected_ballots(modeladmin, request, queryset):
 
 @admin.register(models.BallotWebsite)
 class BallotWebsiteAdmin(DefaultFiltersMixin, admin.ModelAdmin):
-    search_fields = ["mvic_election_id", "mvic_precinct_id", "mvic_html"]
+    search_fields = ["mvic_election_id", "mvic_precinct_id"]
 
     list_filter = ["mvic_election_id", "fetched", "valid", "parsed"]
     default_filters = [
@@ -136,6 +134,7 @@ class BallotWebsiteAdmin(DefaultFiltersMixin, admin.ModelAdmin):
         "Link",
         "fetched",
         "last_fetch",
+        "refresh_due",
         "valid",
         "last_validate",
         "data_count",
@@ -152,8 +151,11 @@ class BallotWebsiteAdmin(DefaultFiltersMixin, admin.ModelAdmin):
         "Link",
         "fetched",
         "last_fetch",
+        "churn",
+        "refresh_due",
         "valid",
         "last_validate",
+        "HTML",
         "Data",
         "data_count",
         "last_scrape",
@@ -171,6 +173,9 @@ class BallotWebsiteAdmin(DefaultFiltersMixin, admin.ModelAdmin):
             pid=website.mvic_precinct_id,
         )
 
+    def HTML(self, website: models.BallotWebsite):
+        return format_html("<pre>{html}</pre>", html=website.mvic_html)
+
     def Data(self, website: models.BallotWebsite):
         text = json.dumps(website.data, indent=4)
         html = f"<pre>{text}</pre>"
@@ -235,11 +240,31 @@ class PrecinctJurisdictionListFilter(admin.SimpleListFilter):
         return queryset
 
 
+@admin.register(models.CrawlState)
+class CrawlStateAdmin(admin.ModelAdmin):
+    search_fields = ["mvic_election_id"]
+
+    list_filter = ["task"]
+
+    list_display = [
+        "id",
+        "task",
+        "mvic_election_id",
+        "last_precinct_id",
+        "frontier",
+        "error_count",
+        "ballot_count",
+        "discovering",
+        "finished",
+        "modified",
+    ]
+
+
 @admin.register(models.Ballot)
 class BallotAdmin(DefaultFiltersMixin, admin.ModelAdmin):
     search_fields = [
-        "website__mvic_election_id",
-        "website__mvic_precinct_id",
+        "mvic_election_id",
+        "mvic_precinct_id",
         "precinct__county__name",
         "precinct__jurisdiction__name",
         "precinct__ward",
@@ -1,11 +1,32 @@
+import hashlib
 import itertools
-from datetime import timedelta
+import json
+import multiprocessing
+import time
+from collections import Counter, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, timedelta
 from random import random
+from typing import Callable, Iterable, Iterator
 
+import django
 import log
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
 from django.utils import timezone
 
-from .models import BallotWebsite, Election, Precinct
+from . import helpers
+from .models import (
+    BallotHTML,
+    BallotWebsite,
+    CrawlState,
+    DistrictCategory,
+    Election,
+    ParseCache,
+    Position,
+)
+from .serializers import GlossarySerializer
 
 
 def update_elections():
@@ -13,34 +34,29 @@ def update_elections():
         age = timezone.now() - timedelta(weeks=2)
         if election.date < age.date():
             log.info(f"Deactivating election: {election}")
-
-            while True:
-                websites = BallotWebsite.objects.filter(
-                    mvic_election_id=election.mvic_id, valid=False
-                )
-                if not websites.exists():
-                    break
-                log.info("Deleting 1000 invalid ballot websites")
-                for website in websites[:1000]:
-                    website.delete()
-
+            BallotWebsite.purge_invalid(election.mvic_id)
             election.active = False
             election.save()
+    BallotHTML.purge_unreferenced()
 
 
 def scrape_ballots(
     *,
     starting_election_id: int | None = None,
-    starting_precinct_id: int = 1,
+    starting_precinct_id: int | None = None,
     ballot_limit: int | None = None,
     max_election_error_count: int = 5,
     max_ballot_error_count: int = 40000,
+    workers: int = 1,
+    processes: int = 0,
+    discover: bool = False,
 ):
     current_election = Election.objects.filter(active=True).order_by("mvic_id").first()
     last_election = Election.objects.exclude(active=True).first()
     log.info(f"Current election: {current_election}")
     log.info(f"Last election: {last_election}")
 
+    resume = starting_election_id is None and starting_precinct_id is None
     if starting_election_id is not None:
         pass  # use the provided ID
     elif current_election:
@@ -51,10 +67,24 @@ def scrape_ballots(
         log.warn("No active elections")
         return
 
+    if resume and (
+        state := CrawlState.get_unfinished(
+            CrawlState.SCRAPE, after=starting_election_id
+        )
+    ):
+        log.info(f"Resuming interrupted crawl: {state}")
+        starting_election_id = state.mvic_election_id
+
     error_count = 0
     for election_id in itertools.count(starting_election_id):
         ballot_count = _scrape_ballots_for_election(
-            election_id, starting_precinct_id, ballot_limit, max_ballot_error_count
+            election_id,
+            starting_precinct_id,
+            ballot_limit,
+            max_ballot_error_count,
+            workers,
+            processes,
+            discover,
         )
 
         if ballot_count:
@@ -71,82 +101,602 @@ def scrape_ballots(
             break
 
 
+def refresh_ballots(*, budget: int, workers: int = 1, processes: int = 0) -> int:
+    """Refetch the ballots most likely to have changed within a request budget."""
+    elections = dict(
+        Election.objects.filter(active=True).values_list("mvic_id", "date")
+    )
+    websites = list(
+        BallotWebsite.objects.filter(
+            mvic_election_id__in=elections,
+            fetched=True,
+            refresh_due__lte=timezone.now(),
+        )
+        .defer("data")
+        .order_by("refresh_due")[:budget]
+    )
+    log.info(f"Refreshing {len(websites)} scheduled ballot(s)")
+
+    fetching, parsing, writing = Stage("Fetched"), Stage("Parsed"), Stage("Wrote")
+    lookups: Counter[bool] = Counter()
+    batches: dict[tuple[str, ...], list[BallotWebsite]] = {}
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(workers) as fetcher, _get_parser(processes) as parser:
+        pipeline = _parse_websites(
+            parser,
+            _fetch_websites(fetcher, websites, force=True, window=workers),
+            fetching=fetching,
+            lookups=lookups,
+            window=max(processes, 1),
+        )
+        try:
+            for index, (website, fields, parsed, previous) in enumerate(pipeline, 1):
+                _write_website(
+                    website,
+                    fields,
+                    parsed,
+                    previous,
+                    election_date=elections[website.mvic_election_id],
+                    batches=batches,
+                    parsing=parsing,
+                    writing=writing,
+                )
+                if index % WEBSITE_BATCH_SIZE == 0:
+                    _save_batches(batches)
+        finally:
+            _save_batches(batches)
+            pipeline.close()
+            fetcher.shutdown(cancel_futures=True)
+            parser.shutdown(cancel_futures=True)
+
+    _log_stats(fetching, parsing, writing, lookups, start)
+
+    return len(websites)
+
+
+WEBSITE_FIELDS = [
+    "mvic_content",
+    "mvic_etag",
+    "mvic_last_modified",
+    "fetched",
+    "valid",
+    "parsed",
+    "data",
+    "data_count",
+    "last_fetch",
+    "last_validate",
+    "last_scrape",
+    "last_convert",
+    "churn",
+    "refresh_due",
+]
+WEBSITE_BATCH_SIZE = 100
+
+Snapshot = tuple[bool | None, int]
+ParsedWebsite = tuple[BallotWebsite, tuple[str, ...], Future | None, Snapshot]
+
+
+class Stage:
+    """Throughput of one step in the crawling pipeline."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.seconds = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+
+    def describe(self, elapsed: float) -> str:
+        rate = self.count / elapsed if elapsed else 0.0
+        return (
+            f"{self.name} {self.count} ballot(s) at {rate:.1f} per second"
+            f" ({self.seconds:.1f}s busy)"
+        )
+
+
+class Frontier:
+    """Precinct IDs to probe for an election, ordered by earlier elections.
+
+    Ranges that had valid ballots before are fetched first and extended while
+    new ballots keep appearing within ``gap`` IDs of their edges. The rest of
+    the ID space, up to ``horizon`` IDs past the last valid ballot, is then
+    probed coarse to fine by halving the distance between probes down to
+    ``stride`` and every hit is extended the same way. ``None`` is yielded
+    whenever the next probe depends on websites not validated yet.
+    """
+
+    def __init__(
+        self, known: Iterable[int], *, horizon: int, stride: int = 32, gap: int = 16
+    ):
+        self.ranges: list[tuple[int, int]] = []
+        for precinct_id in sorted(set(known)):
+            if self.ranges and precinct_id - self.ranges[-1][1] <= gap:
+                self.ranges[-1] = (self.ranges[-1][0], precinct_id)
+            else:
+                self.ranges.append((precinct_id, precinct_id))
+        self.horizon = horizon
+        self.stride = stride
+        self.gap = gap
+        self.websites: dict[int, BallotWebsite] = {}
+
+    def __iter__(self) -> Iterator[int | None]:
+        for first, last in self.ranges:
+            yield from self._sweep(range(first, last + 1))
+        for first, last in self.ranges:
+            if self._valid(first):
+                yield from self._extend(first, -1)
+            if self._valid(last):
+                yield from self._extend(last, 1)
+
+        limit = max(filter(self._valid, self.websites), default=0) + self.horizon
+        step = 1 << (limit.bit_length() - 1)
+        while step >= self.stride:
+            probes = yield from self._sweep(range(step, limit + 1, step))
+            for precinct_id in filter(self._valid, probes):
+                yield from self._extend(precinct_id, -1)
+                yield from self._extend(precinct_id, 1)
+            step //= 2
+
+    def _sweep(self, precinct_ids: Iterable[int]) -> Iterator[int | None]:
+        probes = [i for i in precinct_ids if i > 0 and i not in self.websites]
+        yield from probes
+        if probes:
+            yield None
+        return probes
+
+    def _extend(self, precinct_id: int, direction: int) -> Iterator[int | None]:
+        while True:
+            nearby = [precinct_id + direction * i for i in range(1, self.gap + 1)]
+            yield from self._sweep(nearby)
+            found = list(filter(self._valid, nearby))
+            if not found:
+                return
+            precinct_id = found[-1]
+
+    def _valid(self, precinct_id: int) -> bool:
+        website = self.websites.get(precinct_id)
+        return bool(website and website.valid)
+
+
 def _scrape_ballots_for_election(
     election_id: int,
-    starting_precinct_id: int,
+    starting_precinct_id: int | None,
     limit: int | None,
     max_ballot_error_count: int,
+    workers: int = 1,
+    processes: int = 0,
+    discover: bool = False,
 ) -> int:
     log.info(f"Scrapping ballots for election {election_id}")
-    log.info(f"Starting from precinct {starting_precinct_id}")
+    state = CrawlState.start(CrawlState.SCRAPE, election_id)
+    resume = starting_precinct_id is None
+    if resume and state.discovering and not discover:
+        log.warn(f"Restarting interrupted discovery from the first precinct: {state}")
+        state.reset()
+    if resume:
+        starting_precinct_id = state.last_precinct_id + 1
+        ballot_count = state.ballot_count
+        error_count = state.error_count
+    else:
+        ballot_count = error_count = 0
+
+    frontier = None
+    precinct_ids: Iterable[int | None] = itertools.count(starting_precinct_id)
+    if discover and resume:
+        frontier = _get_frontier(election_id, max_ballot_error_count)
+    if frontier:
+        log.info(f"Discovering precincts from {len(frontier.ranges)} known range(s)")
+        if state.discovering or state.last_precinct_id:
+            websites = BallotWebsite.objects.filter(
+                mvic_election_id=election_id, fetched=True
+            ).defer("data")
+            frontier.websites.update((w.mvic_precinct_id, w) for w in websites)
+        precinct_ids = frontier
+    else:
+        log.info(f"Starting from precinct {starting_precinct_id}")
+    state.discovering = frontier is not None
     if limit:
         log.info(f"Stopping after {limit} ballots")
+    if workers > 1:
+        log.info(f"Fetching up to {workers} ballots concurrently")
+    if processes:
+        log.info(f"Parsing ballots in {processes} processes")
+
+    election_date = (
+        Election.objects.filter(mvic_id=election_id)
+        .values_list("date", flat=True)
+        .first()
+    )
+    fetching, parsing, writing = Stage("Fetched"), Stage("Parsed"), Stage("Wrote")
+    lookups: Counter[bool] = Counter()
+    batches: dict[tuple[str, ...], list[BallotWebsite]] = {}
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(workers) as fetcher, _get_parser(processes) as parser:
+        websites = _parse_websites(
+            parser,
+            _fetch_websites(
+                fetcher,
+                _get_websites(
+                    election_id,
+                    precinct_ids,
+                    seen=frontier.websites if frontier else None,
+                ),
+                force=limit is not None,
+                window=workers,
+            ),
+            fetching=fetching,
+            lookups=lookups,
+            window=max(processes, 1),
+        )
+        try:
+            for index, (website, fields, parsed, previous) in enumerate(websites, 1):
+                if fields:
+                    _write_website(
+                        website,
+                        fields,
+                        parsed,
+                        previous,
+                        election_date=election_date,
+                        batches=batches,
+                        parsing=parsing,
+                        writing=writing,
+                    )
+
+                if website.valid:
+                    ballot_count += 1
+                    error_count = 0
+                    state.frontier = max(state.frontier, website.mvic_precinct_id)
+                else:
+                    error_count += 1
+
+                if not frontier:
+                    state.last_precinct_id = website.mvic_precinct_id
+                state.ballot_count = ballot_count
+                state.error_count = error_count
+                if index % WEBSITE_BATCH_SIZE == 0:
+                    _save_batches(batches)
+                    state.save()
+
+                if limit is not None and ballot_count >= limit:
+                    break
 
-    ballot_count = 0
-    error_count = 0
+                if frontier:
+                    continue
 
-    for precinct_id in itertools.count(starting_precinct_id):
-        website: BallotWebsite
-        website, created = BallotWebsite.objects.get_or_create(
-            mvic_election_id=election_id, mvic_precinct_id=precinct_id
-        )
-        if created:
-            log.info(f"Discovered new website: {website}")
-
-        if website.stale or limit is not None:
-            website.fetch()
-            website.validate() and website.scrape() and website.convert()
-        if website.valid:
-            ballot_count += 1
-            error_count = 0
-        else:
-            error_count += 1
+                if error_count >= 1000 and not ballot_count:
+                    log.warn(f"No ballots to scrape for election {election_id}")
+                    break
 
-        if limit is not None and ballot_count >= limit:
-            break
+                if error_count > 1000 and random() < 0.1:
+                    log.warn(
+                        f"Found {ballot_count} ballots with {error_count} successive errors"
+                    )
 
-        if error_count >= 1000 and not ballot_count:
-            log.warn(f"No ballots to scrape for election {election_id}")
-            break
+                if error_count >= max_ballot_error_count:
+                    log.info(f"No more ballots to scrape for election {election_id}")
+                    break
 
-        if error_count > 1000 and random() < 0.1:
-            log.warn(
-                f"Found {ballot_count} ballots with {error_count} successive errors"
-            )
+            state.finished = timezone.now()
+        finally:
+            _save_batches(batches)
+            state.save()
+            websites.close()
+            fetcher.shutdown(cancel_futures=True)
+            parser.shutdown(cancel_futures=True)
 
-        if error_count >= max_ballot_error_count:
-            log.info(f"No more ballots to scrape for election {election_id}")
-            break
+    _log_stats(fetching, parsing, writing, lookups, start)
 
     return ballot_count
 
 
-def parse_ballots(*, election_id: int | None = None, starting_precinct_id: int = 1):
+def _get_frontier(election_id: int, horizon: int) -> Frontier | None:
+    known = (
+        BallotWebsite.objects.filter(mvic_election_id__lt=election_id, valid=True)
+        .values_list("mvic_precinct_id", flat=True)
+        .distinct()
+    )
+    frontier = Frontier(known, horizon=horizon)
+    if not frontier.ranges:
+        log.info("No precincts are known from previous elections")
+        return None
+    return frontier
+
+
+def _get_websites(
+    election_id: int,
+    precinct_ids: Iterable[int | None],
+    *,
+    seen: dict[int, BallotWebsite] | None = None,
+) -> Iterator[BallotWebsite | None]:
+    """Yield websites for precinct IDs, loading and creating them in blocks.
+
+    Blocks double in size up to a batch so a crawl that stops early does not
+    create many websites past the last one it needed.
+    """
+    block: list[int] = []
+    size = 1
+    for precinct_id in precinct_ids:
+        if precinct_id is not None:
+            block.append(precinct_id)
+            if len(block) < size:
+                continue
+
+        yield from _load_websites(election_id, block, seen)
+        block = []
+        size = min(size * 2, WEBSITE_BATCH_SIZE)
+        if precinct_id is None:
+            yield None
+
+    yield from _load_websites(election_id, block, seen)
+
+
+def _load_websites(
+    election_id: int,
+    precinct_ids: list[int],
+    seen: dict[int, BallotWebsite] | None,
+) -> list[BallotWebsite]:
+    if not precinct_ids:
+        return []
+
+    queryset = BallotWebsite.objects.filter(
+        mvic_election_id=election_id, mvic_precinct_id__in=precinct_ids
+    ).defer("data")
+    websites = {website.mvic_precinct_id: website for website in queryset}
+    missing = [
+        BallotWebsite(mvic_election_id=election_id, mvic_precinct_id=precinct_id)
+        for precinct_id in precinct_ids
+        if precinct_id not in websites
+    ]
+    if missing:
+        log.info(f"Discovered {len(missing)} new website(s) for election {election_id}")
+        # Another crawl may create the same websites, which lack IDs when ignored
+        BallotWebsite.objects.bulk_create(missing, ignore_conflicts=True)
+        websites = {website.mvic_precinct_id: website for website in queryset.all()}
+
+    if seen is not None:
+        seen.update(websites)
+    return [websites[precinct_id] for precinct_id in precinct_ids]
+
+
+def _fetch_websites(
+    executor: Executor,
+    websites: Iterable[BallotWebsite | None],
+    *,
+    force: bool,
+    window: int,
+) -> Iterator[tuple[BallotWebsite, Future | None]]:
+    """Yield websites in order while the next ones are fetched.
+
+    A ``None`` website waits for every website requested so far to be
+    consumed, which lets the caller decide where to look next.
+    """
+    pending: deque[tuple[BallotWebsite, Future | None]] = deque()
+
+    for website in websites:
+        if website is None:
+            while pending:
+                yield pending.popleft()
+            continue
+
+        page = None
+        if website.stale or force:
+            page = executor.submit(
+                _timed,
+                helpers.fetch_ballot_html,
+                website.mvic_url,
+                website.mvic_etag,
+                website.mvic_last_modified,
+            )
+        pending.append((website, page))
+
+        if len(pending) >= window:
+            yield pending.popleft()
+
+    while pending:
+        yield pending.popleft()
+
+
+def _parse_websites(
+    executor: Executor,
+    websites: Iterator[tuple[BallotWebsite, Future | None]],
+    *,
+    fetching: Stage,
+    lookups: Counter[bool],
+    window: int,
+) -> Iterator[ParsedWebsite]:
+    """Yield validated websites in order while the next ones are parsed.
+
+    Websites are paired with the fields that need to be saved, which is
+    only the fetch bookkeeping when the ballot HTML has not changed, and
+    their validity and item count from before they were fetched.
+    """
+    pending: deque[ParsedWebsite] = deque()
+
+    for website, page in websites:
+        fields: tuple[str, ...] = ()
+        parsed = None
+        previous = website.valid, website.data_count
+        if page:
+            result, seconds = page.result()
+            fetching.add(seconds)
+            if website.fetch(result, commit=False) or website.outdated:
+                fields = tuple(WEBSITE_FIELDS)
+                if website.validate(commit=False):
+                    ballot = helpers.get_cached_ballot(website.mvic_html)
+                    lookups[ballot is not None] += 1
+                    parsed = executor.submit(
+                        _timed,
+                        helpers.parse_website,
+                        website.mvic_html,
+                        website.mvic_url,
+                        ballot,
+                    )
+            else:
+                fields = tuple(BallotWebsite.FETCH_FIELDS)
+        pending.append((website, fields, parsed, previous))
+
+        if len(pending) >= window:
+            yield pending.popleft()
+
+    while pending:
+        yield pending.popleft()
+
+
+def _write_website(
+    website: BallotWebsite,
+    fields: tuple[str, ...],
+    parsed: Future | None,
+    previous: Snapshot,
+    *,
+    election_date: date | None,
+    batches: dict[tuple[str, ...], list[BallotWebsite]],
+    parsing: Stage,
+    writing: Stage,
+) -> None:
+    result = None
+    if parsed:
+        result, seconds = parsed.result()
+        parsing.add(seconds)
+
+    started = time.perf_counter()
+    if result and website.scrape(result, commit=False):
+        website.convert(commit=False)
+    current = website.valid, website.data_count
+    changed = previous[0] is not None and current != previous
+    website.schedule(election_date, changed=changed)
+    deferred = website.get_deferred_fields()
+    fields = tuple(field for field in fields if field not in deferred)
+    batches.setdefault(fields, []).append(website)
+    writing.add(time.perf_counter() - started)
+
+
+def _log_stats(
+    fetching: Stage,
+    parsing: Stage,
+    writing: Stage,
+    lookups: Counter[bool],
+    start: float,
+) -> None:
+    elapsed = time.perf_counter() - start
+    for stage in [fetching, parsing, writing]:
+        log.info(stage.describe(elapsed))
+
+    if total := lookups.total():
+        log.info(
+            f"Reused cached ballot items for {lookups[True]} of {total}"
+            f" ballot(s) ({lookups[True] / total:.0%} hit rate)"
+        )
+
+    stats = helpers.get_session_stats()
+    log.info(
+        f"Sent {stats['requests']} MVIC request(s)"
+        f" over {stats['connections']} connection(s)"
+    )
+
+
+def _get_parser(processes: int) -> Executor:
+    if processes:
+        return ProcessPoolExecutor(
+            processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        )
+    return ThreadPoolExecutor(1)
+
+
+def _timed(function: Callable, *args):
+    start = time.perf_counter()
+    value = function(*args)
+    return value, time.perf_counter() - start
+
+
+def _save_batches(batches: dict[tuple[str, ...], list[BallotWebsite]]) -> None:
+    for fields, websites in batches.items():
+        if websites:
+            BallotHTML.store(websites)
+            BallotWebsite.objects.bulk_update(websites, fields)
+            websites.clear()
+
+
+def parse_ballots(
+    *,
+    election_id: int | None = None,
+    starting_precinct_id: int | None = None,
+    workers: int = 1,
+):
     if election_id:
         elections = Election.objects.filter(mvic_id=election_id)
     else:
         elections = Election.objects.filter(active=True)
 
     for election in elections:
-        _parse_ballots_for_election(election, starting_precinct_id)
+        _parse_ballots_for_election(election, starting_precinct_id, workers)
 
 
-def _parse_ballots_for_election(election: Election, starting_precinct_id: int):
+def _parse_ballots_for_election(
+    election: Election, starting_precinct_id: int | None, workers: int = 1
+):
     log.info(f"Parsing ballots for election {election.mvic_id}")
+    state = CrawlState.start(CrawlState.PARSE, election.mvic_id)
+    if starting_precinct_id is None:
+        starting_precinct_id = state.last_precinct_id + 1
     log.info(f"Starting from precinct {starting_precinct_id}")
 
-    precincts: set[Precinct] = set()
-
-    websites = (
-        BallotWebsite.objects.filter(mvic_election_id=election.mvic_id, valid=True)
-        .order_by("mvic_precinct_id")
-        .defer("mvic_html", "data")
-    )
+    websites = BallotWebsite.objects.filter(
+        mvic_election_id=election.mvic_id, valid=True
+    ).order_by("mvic_precinct_id")
     if starting_precinct_id:
         websites = websites.filter(mvic_precinct_id__gte=starting_precinct_id)
     log.info(f"Mapping {websites.count()} websites to ballots")
 
-    for website in websites:
+    precincts: set[int] = set()
+    if workers > 1:
+        precinct_ids = list(websites.values_list("mvic_precinct_id", flat=True))
+        ranges = _partition(precinct_ids, workers)
+        log.info(f"Parsing {len(ranges)} precinct range(s) in {workers} processes")
+        with ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=helpers.setup_process,
+            initargs=(connection.settings_dict["NAME"],),
+        ) as executor:
+            futures = [
+                executor.submit(_parse_precinct_range, election.pk, first, last)
+                for first, last in ranges
+            ]
+            for future, (_first, last) in zip(futures, ranges):
+                precincts.update(future.result())
+                state.last_precinct_id = last
+                state.save()
+    else:
+        precincts = _parse_websites_to_ballots(election, websites, state)
+
+    state.finish()
+    log.info(f"Parsed ballots for {len(precincts)} unique precincts")
+
+
+def _parse_precinct_range(election_pk: int, first: int, last: int) -> set[int]:
+    election = Election.objects.get(pk=election_pk)
+    websites = BallotWebsite.objects.filter(
+        mvic_election_id=election.mvic_id,
+        valid=True,
+        mvic_precinct_id__range=(first, last),
+    ).order_by("mvic_precinct_id")
+    log.info(f"Parsing ballots for precincts {first} through {last}")
+    return _parse_websites_to_ballots(election, websites)
+
+
+def _parse_websites_to_ballots(
+    election: Election, websites, state: CrawlState | None = None
+) -> set[int]:
+    precincts: set[int] = set()
+    cache = ParseCache(election)
+
+    for index, website in enumerate(websites.defer("data"), start=1):
         if not website.data:
             website.scrape()
 
@@ -154,13 +704,49 @@ def _parse_ballots_for_election(election: Election, starting_precinct_id: int):
 
         if ballot.stale:
             try:
-                ballot.parse()
+                ballot.parse(cache)
             except ValueError:
                 log.warn(f"Rescrapping after parse error: {website}")
                 website.scrape()
                 ballot = website.convert()
-                ballot.parse()
+                ballot.parse(cache)
 
-        precincts.add(ballot.precinct)
+        precincts.add(ballot.precinct_id)
 
-    log.info(f"Parsed ballots for {len(precincts)} unique precincts")
+        if state and index % WEBSITE_BATCH_SIZE == 0:
+            cache.flush()
+            state.last_precinct_id = website.mvic_precinct_id
+            state.save()
+
+    cache.flush()
+    return precincts
+
+
+def _partition(values: list[int], count: int) -> list[tuple[int, int]]:
+    """Split sorted values into at most the given number of inclusive ranges."""
+    size = -(-len(values) // count) if values else 1
+    return [
+        (values[index], values[min(index + size, len(values)) - 1])
+        for index in range(0, len(values), size)
+    ]
+
+
+GLOSSARY_CACHE_KEY = f"glossary:{settings.API_CACHE_KEY}"
+
+
+def update_glossary() -> tuple[str, list[dict]]:
+    """Rebuild the cached glossary and return its ETag and terms."""
+    items: list = list(DistrictCategory.objects.only("name", "description"))
+    items.extend(
+        Position.objects.only("name", "description")
+        .order_by("name", "seats", "id")
+        .distinct("name")
+    )
+    data = [dict(item) for item in GlossarySerializer(items, many=True).data]
+
+    content = json.dumps(data, sort_keys=True).encode()
+    etag = '"%s"' % hashlib.sha1(content).hexdigest()
+    cache.set(GLOSSARY_CACHE_KEY, (etag, data), settings.GLOSSARY_CACHE_SECONDS)
+
+    log.info(f"Cached {len(data)} glossary term(s)")
+    return etag, data
@@ -1,20 +1,34 @@
+import hashlib
+import itertools
+import random
 import re
 import string
+import threading
 import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from functools import cache
-from typing import Any
+from typing import Any, Callable
+from urllib.parse import urlparse
 
+import django
 import log
 import pomace
 import requests
 from bs4 import BeautifulSoup
 from bs4.element import Tag
+from django.conf import settings
+from django.core.cache import cache as django_cache
+from django.utils import timezone
 from fake_useragent import UserAgent
 from nameparser import HumanName
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
 
 from . import exceptions
-from .constants import MVIC_URL
+from .constants import MVIC_URL, SCRAPER_LAST_UPDATED
 
 user_agent = UserAgent(
     platforms="pc",
@@ -134,6 +148,115 @@ def normalize_address(line: str) -> str:
     return line.replace(", Michigan", ", MI")
 
 
+class RateLimiter:
+    """Space out requests to each host, even when shared between threads."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next: dict[str, float] = {}
+
+    def wait(self, url: str) -> None:
+        if not self.rate:
+            return
+
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, now))
+            self._next[host] = start + 1 / self.rate
+
+        if start > now:
+            time.sleep(start - now)
+
+
+rate_limiter = RateLimiter(settings.MVIC_REQUESTS_PER_SECOND)
+
+
+class RetryBudget:
+    """Allow retries while they stay a share of recent requests."""
+
+    def __init__(self, ratio: float, *, window: float = 60.0, minimum: int = 1):
+        self.ratio = ratio
+        self.window = window
+        self.minimum = minimum
+        self._lock = threading.Lock()
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+
+    def record(self) -> None:
+        with self._lock:
+            self._requests.append(time.monotonic())
+
+    def reserve(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            for events in (self._requests, self._retries):
+                while events and events[0] < now - self.window:
+                    events.popleft()
+            allowed = max(self.minimum, self.ratio * len(self._requests))
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+
+retry_budget = RetryBudget(settings.MVIC_RETRY_BUDGET)
+
+
+REGISTRATION_URL = f"{MVIC_URL}/Voter/SearchByName"
+
+
+def build_session() -> requests.Session:
+    """Create an HTTP session that keeps connections to MVIC open.
+
+    Ballot pages are retried on connection errors and server errors, but
+    registration searches only get one extra connection attempt so that a
+    lookup stays within its deadline.
+    """
+    retry = Retry(
+        total=settings.MVIC_RETRY_COUNT,
+        read=0,
+        backoff_factor=settings.MVIC_RETRY_BACKOFF,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=["GET"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_maxsize=settings.MVIC_POOL_SIZE, max_retries=retry)
+    search_adapter = HTTPAdapter(
+        pool_maxsize=settings.MVIC_POOL_SIZE,
+        max_retries=Retry(total=1, read=0, status=0, raise_on_status=False),
+    )
+
+    session = requests.Session()
+    session.headers.update(make_headers(accept_encoding=True))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.mount(REGISTRATION_URL, search_adapter)
+    return session
+
+
+session = build_session()
+
+
+def get_session_stats() -> dict[str, int]:
+    """Count the requests sent and the connections opened to send them."""
+    stats = {"requests": 0, "connections": 0}
+    adapter = session.get_adapter(MVIC_URL)
+    pools = adapter.poolmanager.pools  # type: ignore[attr-defined]
+    for key in pools.keys():
+        pool = pools[key]
+        stats["requests"] += pool.num_requests
+        stats["connections"] += pool.num_connections
+    return stats
+
+
+def setup_process(database_name: str) -> None:
+    """Initialize Django in a worker process using the parent's database."""
+    settings.DATABASES["default"]["NAME"] = database_name
+    django.setup()
+
+
 def build_mvic_url(election_id: int, precinct_id: int) -> str:
     assert election_id, "MVIC election ID is missing"
     assert precinct_id, "MVIC precinct ID is missing"
@@ -144,12 +267,225 @@ def build_mvic_url(election_id: int, precinct_id: int) -> str:
 # Registration helpers
 
 
+def get_voter_key(voter) -> str:
+    """Identify a voter by the normalized fields MVIC searches on."""
+    fields = (
+        voter.first_name.strip().lower(),
+        voter.last_name.strip().lower(),
+        voter.birth_year,
+        voter.birth_month,
+        voter.zip_code.strip(),
+    )
+    digest = hashlib.sha256(repr(fields).encode()).hexdigest()
+    return f"voter:{settings.API_CACHE_KEY}:{digest}"
+
+
+_flights: dict[str, threading.Event] = {}
+_flights_lock = threading.Lock()
+
+
+def coalesce(key: str, function: Callable, *args):
+    """Call a function once for all concurrent callers sharing a key.
+
+    The first caller in each process registers an event and then takes a
+    lock in the cache, outside the process-wide lock, to publish its result.
+    Callers in the same process wait for it on the event, callers in other
+    processes poll the cache, and all of them retry for the lock if the
+    first caller fails without a result.
+    """
+    seconds = settings.REGISTRATION_LOCK_SECONDS
+    if not seconds:
+        return function(*args)
+
+    lock_key, result_key = f"{key}:lock", f"{key}:result"
+    deadline = time.monotonic() + settings.MVIC_LOOKUP_SECONDS
+    delay = 0.05
+    while True:
+        if (result := django_cache.get(result_key)) is not None:
+            return result
+        with _flights_lock:
+            flight = _flights.get(key)
+            if leading := flight is None:
+                flight = _flights[key] = threading.Event()
+        if leading:
+            if django_cache.add(lock_key, True, seconds):
+                break
+            _land(key)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            log.warn(f"Timed out waiting for {key}")
+            raise exceptions.ServiceUnavailable()
+        if leading:
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 1.0)
+        else:
+            flight.wait(remaining)
+
+    try:
+        value = function(*args)
+        django_cache.set(result_key, value, seconds)
+        return value
+    finally:
+        django_cache.delete(lock_key)
+        _land(key)
+
+
+def _land(key: str) -> None:
+    with _flights_lock:
+        _flights.pop(key).set()
+
+
+refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="refresh")
+
+# Request threads waiting on MVIC, including callers coalesced onto another
+# lookup, so that the rest of each worker's threads keep serving reads
+lookup_slots = threading.BoundedSemaphore(settings.MVIC_LOOKUP_CONCURRENCY)
+
+
+def get_registration_status_data(voter) -> tuple[dict, datetime]:
+    """Look up a voter's cached MVIC data and when it was fetched.
+
+    Expired data keeps being served while it is refreshed in the background,
+    which also covers MVIC outages until the stale window ends. Lookups are
+    rejected at once when every slot is busy instead of taking more threads.
+    """
+    key = get_voter_key(voter)
+    if settings.API_CACHE_SECONDS and (entry := django_cache.get(key)):
+        _data, fetched = entry
+        age = timezone.now() - fetched
+        if age.total_seconds() > settings.API_CACHE_SECONDS and django_cache.add(
+            f"{key}:refreshing", True, settings.MVIC_LOOKUP_SECONDS
+        ):
+            log.info(f"Refreshing registration status fetched {age} ago")
+            refresher.submit(_refresh_registration_status_data, key, voter)
+        return entry
+
+    if not lookup_slots.acquire(blocking=False):
+        log.warn("Too many MVIC lookups in progress")
+        raise exceptions.ServiceUnavailable()
+    try:
+        return _update_registration_status_data(key, voter)
+    finally:
+        lookup_slots.release()
+
+
+def _update_registration_status_data(key: str, voter) -> tuple[dict, datetime]:
+    return coalesce(key, _lookup_registration_status_data, key, voter)
+
+
+def _lookup_registration_status_data(key: str, voter) -> tuple[dict, datetime]:
+    data = fetch_registration_status_data(voter)
+    return _store_registration_status_data(key, voter, data)
+
+
+def _store_registration_status_data(
+    key: str, voter, data: dict, attempt: int = 0
+) -> tuple[dict, datetime]:
+    entry = data, timezone.now()
+    if data["registered"] is None:
+        _count_registration_stat("ambiguous")
+        _schedule_registration_retry(key, voter, attempt)
+    elif settings.API_CACHE_SECONDS:
+        seconds = settings.API_CACHE_SECONDS + settings.API_STALE_SECONDS
+        django_cache.set(key, entry, seconds)
+    return entry
+
+
+def _schedule_registration_retry(key: str, voter, attempt: int) -> None:
+    """Request an ambiguous page again later without holding a worker thread.
+
+    A marker in the cache limits each voter to one chain of retries across
+    all processes, which ends when the page is clear or the retries run out.
+    """
+    if not settings.API_CACHE_SECONDS:
+        log.warn("Unable to determine registration status")
+        return
+    if attempt == 0 and not django_cache.add(
+        f"{key}:retrying", True, _get_retry_seconds()
+    ):
+        log.warn("Unable to determine registration status, already retrying")
+        return
+    if attempt >= settings.MVIC_AMBIGUOUS_RETRY_COUNT or not retry_budget.reserve():
+        log.warn("Unable to determine registration status, not retrying")
+        django_cache.delete(f"{key}:retrying")
+        return
+
+    _count_registration_stat("retries")
+    delay = settings.MVIC_RETRY_BACKOFF * 2**attempt * (0.5 + random.random())
+    log.warn(f"Unable to determine registration status, retrying in {delay:.1f}s")
+    timer = threading.Timer(
+        delay, _retry_registration_status_data, (key, voter, attempt + 1)
+    )
+    timer.daemon = True
+    timer.start()
+
+
+def _get_retry_seconds() -> float:
+    """Bound the retry marker in case a chain of retries never finishes."""
+    count = settings.MVIC_AMBIGUOUS_RETRY_COUNT
+    delays = 1.5 * settings.MVIC_RETRY_BACKOFF * 2**count
+    return delays + 2 * count * settings.MVIC_LOOKUP_SECONDS
+
+
+def _retry_registration_status_data(key: str, voter, attempt: int) -> None:
+    try:
+        data = fetch_registration_status_data(voter)
+    except exceptions.ServiceUnavailable:
+        log.warn("Unable to retry registration status")
+        django_cache.delete(f"{key}:retrying")
+    else:
+        _store_registration_status_data(key, voter, data, attempt)
+        if data["registered"] is not None:
+            django_cache.delete(f"{key}:retrying")
+
+
+def _refresh_registration_status_data(key: str, voter) -> None:
+    try:
+        _update_registration_status_data(key, voter)
+    except exceptions.ServiceUnavailable:
+        log.warn("Unable to refresh registration status, serving stale data")
+    finally:
+        django_cache.delete(f"{key}:refreshing")
+
+
 def fetch_registration_status_data(voter) -> dict:
-    url = f"{MVIC_URL}/Voter/SearchByName"
-    log.info(f"Submitting form: {url}")
+    """Look up a voter on MVIC within the lookup deadline."""
+    deadline = time.monotonic() + settings.MVIC_LOOKUP_SECONDS
+    return _fetch_registration_status_data(voter, deadline)
+
+
+registration_stats: Counter[str] = Counter()
+_registration_stats_lock = threading.Lock()
+
+
+def get_registration_stats() -> dict[str, int]:
+    """Count MVIC lookups and the re-requests sent for ambiguous pages."""
+    with _registration_stats_lock:
+        return dict(registration_stats)
+
+
+def _count_registration_stat(name: str) -> None:
+    with _registration_stats_lock:
+        registration_stats[name] += 1
+
+
+def _get_timeout(deadline: float) -> tuple[float, float]:
+    """Fit both connection attempts and the response within the deadline."""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        log.error("MVIC lookup deadline exceeded")
+        raise exceptions.ServiceUnavailable()
+    connect = min(3.0, remaining / 3)
+    return connect, min(10.0, remaining - 2 * connect)
+
+
+def _search_registration(
+    voter, deadline: float
+) -> tuple[requests.Response, BeautifulSoup]:
+    log.info(f"Submitting form: {REGISTRATION_URL}")
     try:
-        response = requests.post(
-            url,
+        response = session.post(
+            REGISTRATION_URL,
             headers={
                 "Content-Type": "application/x-www-form-urlencoded",
                 "User-Agent": user_agent.random,
@@ -161,13 +497,13 @@ def fetch_registration_status_data(voter) -> dict:
                 "NameBirthYear": voter.birth_year,
                 "ZipCode": voter.zip_code,
             },
-            timeout=10,
+            timeout=_get_timeout(deadline),
         )
     except requests.exceptions.RequestException as e:
         log.error(f"MVIC connection error: {e}")
         raise exceptions.ServiceUnavailable()
     else:
-        html = BeautifulSoup(response.text, "html.parser")
+        html = build_soup(response.text)
 
     if response.status_code >= 400:
         log.error(f"{response.status_code} error: {html.text}")
@@ -177,17 +513,24 @@ def fetch_registration_status_data(voter) -> dict:
         log.error("District information is unavailable")
         raise exceptions.ServiceUnavailable()
 
+    return response, html
+
+
+def _parse_registered(text: str) -> bool | None:
+    if "Yes, you are registered!" in text:
+        return True
+    if "No voter record matched your search criteria" in text:
+        return False
+    return None
+
+
+def _fetch_registration_status_data(voter, deadline: float) -> dict:
+    _count_registration_stat("lookups")
+    retry_budget.record()
+    response, html = _search_registration(voter, deadline)
+
     # Parse registration
-    registered = None
-    for delay in [0, 1]:
-        time.sleep(delay)
-        if "Yes, you are registered!" in response.text:
-            registered = True
-            break
-        if "No voter record matched your search criteria" in response.text:
-            registered = False
-            break
-        log.warn("Unable to determine registration status")
+    registered = _parse_registered(response.text)
 
     # Parse moved status
     recently_moved = "you have recently moved" in response.text
@@ -337,13 +680,23 @@ def _clean_district_category(text: str):
 # Ballot helpers
 
 
-def fetch_ballot_html(url: str) -> str:
+def fetch_ballot_html(
+    url: str, etag: str = "", last_modified: str = ""
+) -> tuple[str, str, str]:
+    """Fetch ballot HTML and validators, or blank HTML if unmodified."""
+    headers = {"User-Agent": user_agent.random}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    rate_limiter.wait(url)
     log.info(f"Fetching ballot: {url}")
-    response = requests.get(
-        url,
-        headers={"User-Agent": user_agent.random},
-        timeout=10,
-    )
+    response = session.get(url, headers=headers, timeout=10)
+
+    if response.status_code == 304:
+        log.info(f"Ballot has not been modified: {url}")
+        return "", etag, last_modified
 
     if response.status_code >= 400:
         log.error(f"{response.status_code} error: {response.text}")
@@ -351,12 +704,84 @@ def fetch_ballot_html(url: str) -> str:
 
     text = response.text.strip()
     assert "PreviewMvicBallot" in text, f"Invalid ballot: {url}"
-    return text
+    return (
+        text,
+        response.headers.get("ETag", ""),
+        response.headers.get("Last-Modified", ""),
+    )
+
+
+def hash_html(html: str) -> str:
+    return hashlib.sha256(html.encode()).hexdigest()
+
 
+def parse_website(
+    html: str, url: str, ballot: tuple[dict, int] | None = None
+) -> tuple[dict, int]:
+    """Parse all ballot data from HTML and count the parsed items.
 
-def parse_election(html: str) -> tuple[str, tuple[int, int, int]]:
-    """Parse election information from ballot HTML."""
-    soup = BeautifulSoup(html, "html.parser")
+    Ballot items are reused from the cache when another page with the same
+    ballot body was already parsed by the current scraper version.
+    """
+    soup = build_soup(clean_ballot_html(html))
+    data: dict[str, Any] = {}
+    data["election"] = parse_election(soup)
+    data["precinct"] = parse_precinct(html, url)
+    if ballot is None:
+        ballot = get_cached_ballot(html)
+    if ballot is None:
+        items: dict = {}
+        ballot = items, parse_ballot(soup, items)
+        if settings.BALLOT_CACHE_SECONDS:
+            key = get_ballot_key(html)
+            django_cache.set(key, ballot, settings.BALLOT_CACHE_SECONDS)
+    data["ballot"], count = ballot
+    return data, count
+
+
+def split_ballot_html(html: str) -> tuple[str, str]:
+    """Separate the precinct header from the ballot items in ballot HTML."""
+    start = html.find('class="text-center"')
+    end = html.find("</div>", start) if start >= 0 else 0
+    stop = html.find("</main>", end)
+    header = html[start:end] if start >= 0 else ""
+    body = html[end:stop] if stop >= 0 else html[end:]
+    return header, body
+
+
+def get_ballot_key(html: str) -> str:
+    """Identify ballot items independently of the precinct header."""
+    _header, body = split_ballot_html(html)
+    version = int(SCRAPER_LAST_UPDATED.timestamp())
+    return f"ballot:{version}:{hash_html(body.strip())}"
+
+
+def get_cached_ballot(html: str) -> tuple[dict, int] | None:
+    if settings.BALLOT_CACHE_SECONDS:
+        return django_cache.get(get_ballot_key(html))
+    return None
+
+
+def build_soup(html: str) -> BeautifulSoup:
+    """Parse HTML with the configured BeautifulSoup tree builder."""
+    return BeautifulSoup(html, settings.HTML_PARSER)
+
+
+def clean_ballot_html(html: str) -> str:
+    """Normalize whitespace in ballot HTML before parsing."""
+    return (
+        html.replace("&nbsp;", " ")
+        .replace("<br>", "\n")
+        .replace("\n ", "\n")
+        .replace(" \n", "\n")
+        .replace("  ", " ")
+        .replace("  ", " ")
+    )
+
+
+def parse_election(html: str | BeautifulSoup) -> tuple[str, tuple[int, int, int]]:
+    """Parse election information from ballot HTML or its parsed tree."""
+    soup = build_soup(html) if isinstance(html, str) else html
     header = soup.find(id="PreviewMvicBallot").div.div.div.text
 
     election_name_text, election_date_text, *_ = header.strip().split("\n")
@@ -368,20 +793,29 @@ def parse_election(html: str) -> tuple[str, tuple[int, int, int]]:
 
 def parse_precinct(html: str, url: str) -> tuple[str, str, str, str]:
     """Parse precinct information from ballot HTML."""
+    header, _body = split_ballot_html(html)
+    sources = [header, html] if header else [html]
 
     # Parse county
-    match = re.search(r"(?P<county>[^>]+) County, Michigan", html, re.IGNORECASE)
+    match = None
+    for source in sources:
+        match = re.search(r"(?P<county>[^>]+) County, Michigan", source, re.IGNORECASE)
+        if match:
+            break
     assert match, f"Unable to find county name: {url}"
     county = titleize(match.group("county"))
 
     # Parse jurisdiction
     match = None
-    for pattern in [
-        r"(?P<jurisdiction>[^>]+), Ward (?P<ward>\d+) Precinct (?P<precinct>\d+)",
-        r"(?P<jurisdiction>[^>]+),  Precinct (?P<precinct>\d+[A-Z]?)",
-        r"(?P<jurisdiction>[^>]+), Ward (?P<ward>\d+)",
-    ]:
-        match = re.search(pattern, html)
+    for source, pattern in itertools.product(
+        sources,
+        [
+            r"(?P<jurisdiction>[^>]+), Ward (?P<ward>\d+) Precinct (?P<precinct>\d+)",
+            r"(?P<jurisdiction>[^>]+),  Precinct (?P<precinct>\d+[A-Z]?)",
+            r"(?P<jurisdiction>[^>]+), Ward (?P<ward>\d+)",
+        ],
+    ):
+        match = re.search(pattern, source)
         if match:
             break
     assert match, f"Unable to find precinct information: {url}"
@@ -437,80 +871,108 @@ def parse_seats(text: str) -> int:
         return 0
 
 
-def parse_ballot(html: str, data: dict) -> int:
+BALLOT_SECTIONS = [
+    "twoPartyPrimaryElectionOffices",
+    "columnOnePrimary",
+    "columnTwoPrimary",
+    "generalElectionOffices",
+    "proposals",
+]
+BALLOT_TOKENS = [
+    "section",
+    "division",
+    "office",
+    "term",
+    "candidate",
+    "financeLink",
+    "party",
+    "proposalTitle",
+    "proposalText",
+]
+
+
+def parse_ballot(html: str | BeautifulSoup, data: dict) -> int:
     """Call all parsers to insert ballot data into the provided dictionary."""
-    html = (
-        html.replace("&nbsp;", " ")
-        .replace("<br>", "\n")
-        .replace("\n ", "\n")
-        .replace(" \n", "\n")
-        .replace("  ", " ")
-        .replace("  ", " ")
-    )
-    soup = BeautifulSoup(html, "html.parser")
+    soup = build_soup(clean_ballot_html(html)) if isinstance(html, str) else html
     ballot = soup.find(id="PreviewMvicBallot").div.div.find_all("div", recursive=False)[
         1
     ]
+    tokens = tokenize_ballot(ballot)
     count = 0
-    count += parse_primary_election_offices(ballot, data)
-    count += parse_general_election_offices(ballot, data)
-    count += parse_proposals(ballot, data)
+    count += parse_primary_election_offices(ballot, tokens, data)
+    count += parse_general_election_offices(tokens, data)
+    count += parse_proposals(tokens, data)
     return count
 
 
-def parse_primary_election_offices(ballot: BeautifulSoup, data: dict) -> int:
+def tokenize_ballot(ballot: Tag) -> dict[str, list[tuple[str, Tag]]]:
+    """Classify ballot elements by section in a single pass over the tree.
+
+    Each known section maps to its typed elements in document order, which
+    are attributed to the innermost section containing them.
+    """
+    sections: dict[str, list[tuple[str, Tag]]] = {}
+
+    def walk(element: Tag, tokens: list[tuple[str, Tag]] | None):
+        for child in element.children:
+            if not isinstance(child, Tag):
+                continue
+            child_tokens = tokens
+            if child.name == "div":
+                if (key := child.get("id")) in BALLOT_SECTIONS:
+                    child_tokens = sections.setdefault(key, [])
+                elif tokens is not None and (classes := child.get("class")):
+                    for kind in BALLOT_TOKENS:
+                        if kind in classes:
+                            tokens.append((kind, child))
+                            break
+            walk(child, child_tokens)
+
+    walk(ballot, None)
+    return sections
+
+
+def parse_primary_election_offices(
+    ballot: Tag, tokens: dict[str, list[tuple[str, Tag]]], data: dict
+) -> int:
     """Inserts primary election ballot data into the provided dictionary."""
     count = 0
 
-    offices = ballot.find(id="twoPartyPrimaryElectionOffices")
-    if not offices:
+    if "twoPartyPrimaryElectionOffices" not in tokens:
         return count
 
     section: dict = {}
     label = "primary section"
     data[label] = section
 
-    count += _parse_primary_election_offices("Democratic", ballot, section)
-    count += _parse_primary_election_offices("Republican", ballot, section)
+    text = ballot.text
+    assert text.find("DEMOCRATIC") < text.find("REPUBLICAN")
+    count += _parse_primary_election_offices(
+        "Democratic", tokens.get("columnOnePrimary"), section
+    )
+    count += _parse_primary_election_offices(
+        "Republican", tokens.get("columnTwoPrimary"), section
+    )
     return count
 
 
 def _parse_primary_election_offices(
-    party: str, ballot: BeautifulSoup, data: dict
+    party: str, tokens: list[tuple[str, Tag]] | None, data: dict
 ) -> int:
     """Inserts primary election ballot data into the provided dictionary."""
     count = 0
 
-    assert ballot.text.find("DEMOCRATIC") < ballot.text.find("REPUBLICAN")
-    offices = ballot.find(
-        id="columnOnePrimary" if party == "Democratic" else "columnTwoPrimary"
-    )
-    if not offices:
+    if tokens is None:
         return count
 
     section: dict[str, Any] = {}
     division: list | None = None
     data[party] = section
 
-    for index, item in enumerate(
-        offices.find_all(
-            "div",
-            {
-                "class": [
-                    "division",
-                    "office",
-                    "term",
-                    "candidate",
-                    "financeLink",
-                    "party",
-                ]
-            },
-        ),
-        start=1,
-    ):
-        log.debug(f"Parsing office element {index}: {item}")
+    for index, (kind, item) in enumerate(tokens, start=1):
+        log.debug(f"Parsing office element {index}: {kind}")
 
-        if "division" in item["class"]:
+        if kind == "division":
             label = (
                 titleize(item.text).replace(" - Continued", "").replace(" District", "")
             )
@@ -521,7 +983,7 @@ def _parse_primary_election_offices(
             section[label] = division
             office = None
 
-        elif "office" in item["class"]:
+        elif kind == "office":
             label = normalize_position(item.text)
             assert division is not None, f"Division missing for office: {label}"
             office = {
@@ -534,7 +996,7 @@ def _parse_primary_election_offices(
             }
             division.append(office)
 
-        elif "term" in item["class"]:
+        elif kind == "term":
             label = item.text
             assert office is not None, f"Office missing for term: {label}"
             if "Incumbent " in label or "New " in label:
@@ -547,7 +1009,7 @@ def _parse_primary_election_offices(
                 office["district"] = titleize(label)
             count += 1
 
-        elif "candidate" in item["class"]:
+        elif kind == "candidate":
             label = normalize_candidate(item.get_text("\n"))
             assert office is not None, f"Office missing for candidate: {label}"
             if label == "No candidates on ballot":
@@ -560,11 +1022,11 @@ def _parse_primary_election_offices(
             office["candidates"].append(candidate)
             count += 1
 
-        elif "financeLink" in item["class"]:
+        elif kind == "financeLink":
             if item.a:
                 candidate["finance_link"] = item.a["href"]
 
-        elif "party" in item["class"]:
+        elif kind == "party":
             label = titleize(item.text)
             assert candidate is not None, f"Candidate missing for party: {label}"
             candidate["party"] = label or None
@@ -572,35 +1034,20 @@ def _parse_primary_election_offices(
     return count
 
 
-def parse_general_election_offices(ballot: BeautifulSoup, data: dict) -> int:
+def parse_general_election_offices(
+    tokens: dict[str, list[tuple[str, Tag]]], data: dict
+) -> int:
     """Inserts general election ballot data into the provided dictionary."""
     count = 0
 
-    offices = ballot.find(id="generalElectionOffices")
-    if not offices:
+    if "generalElectionOffices" not in tokens:
         return count
 
     section: dict | None = None
-    for index, item in enumerate(
-        offices.find_all(
-            "div",
-            {
-                "class": [
-                    "section",
-                    "division",
-                    "office",
-                    "term",
-                    "candidate",
-                    "financeLink",
-                    "party",
-                ]
-            },
-        ),
-        start=1,
-    ):
-        log.debug(f"Parsing office element {index}: {item}")
+    for index, (kind, item) in enumerate(tokens["generalElectionOffices"], start=1):
+        log.debug(f"Parsing office element {index}: {kind}")
 
-        if "section" in item["class"]:
+        if kind == "section":
             section = {}
             division: list | None = None
             office: dict | None = None
@@ -611,7 +1058,7 @@ def parse_general_election_offices(ballot: BeautifulSoup, data: dict) -> int:
             else:
                 data[label] = section
 
-        elif "division" in item["class"]:
+        elif kind == "division":
             office = None
             label = (
                 titleize(item.text).replace(" - Continued", "").replace(" District", "")
@@ -628,7 +1075,7 @@ def parse_general_election_offices(ballot: BeautifulSoup, data: dict) -> int:
             section[label] = division
             office = None
 
-        elif "office" in item["class"]:
+        elif kind == "office":
             label = normalize_position(item.text)
             if division is None:
                 assert (
@@ -647,7 +1094,7 @@ def parse_general_election_offices(ballot: BeautifulSoup, data: dict) -> int:
             }
             division.append(office)
 
-        elif "term" in item["class"]:
+        elif kind == "term":
             label = item.text
             assert office is not None, f"Office missing for term: {label}"
             if "Incumbent " in label or "New " in label:
@@ -660,7 +1107,7 @@ def parse_general_election_offices(ballot: BeautifulSoup, data: dict) -> int:
                 office["district"] = titleize(label)
             count += 1
 
-        elif "candidate" in item["class"]:
+        elif kind == "candidate":
             label = normalize_candidate(item.get_text("\n"))
             assert office is not None, f"Office missing for candidate: {label}"
             if label == "No candidates on ballot":
@@ -669,11 +1116,11 @@ def parse_general_election_offices(ballot: BeautifulSoup, data: dict) -> int:
             office["candidates"].append(candidate)
             count += 1
 
-        elif "financeLink" in item["class"]:
+        elif kind == "financeLink":
             if item.a:
                 candidate["finance_link"] = item.a["href"]
 
-        elif "party" in item["class"]:
+        elif kind == "party":
             label = titleize(item.text)
             assert candidate is not None, f"Candidate missing for party: {label}"
             candidate["party"] = label or None
@@ -681,30 +1128,29 @@ def parse_general_election_offices(ballot: BeautifulSoup, data: dict) -> int:
     return count
 
 
-def parse_proposals(ballot: BeautifulSoup, data: dict) -> int:
+def parse_proposals(tokens: dict[str, list[tuple[str, Tag]]], data: dict) -> int:
     """Inserts proposal data into the provided dictionary."""
     count = 0
 
-    proposals = ballot.find(id="proposals")
-    if not proposals:
+    if "proposals" not in tokens:
         return count
 
-    for index, item in enumerate(
-        proposals.find_all(
-            "div", {"class": ["section", "division", "proposalTitle", "proposalText"]}
-        ),
-        start=1,
-    ):
-        log.debug(f"Parsing proposal element {index}: {item}")
+    items = [
+        (kind, item)
+        for kind, item in tokens["proposals"]
+        if kind in {"section", "division", "proposalTitle", "proposalText"}
+    ]
+    for index, (kind, item) in enumerate(items, start=1):
+        log.debug(f"Parsing proposal element {index}: {kind}")
 
-        if "section" in item["class"]:
+        if kind == "section":
             section: dict[str, Any] = {}
             division: list | None = None
             proposal = None
             label = item.text.lower()
             data[label] = section
 
-        elif "division" in item["class"]:
+        elif kind == "division":
             proposal = None
             label = (
                 titleize(item.text).replace(" Proposals", "").replace(" District", "")
@@ -716,7 +1162,7 @@ def parse_proposals(ballot: BeautifulSoup, data: dict) -> int:
                 division = []
             section[label] = division
 
-        elif "proposalTitle" in item["class"]:
+        elif kind == "proposalTitle":
             label = _html_to_text(item)
             if "\n" in label and "?" in label and len(label) > 200:
                 log.debug("Parsing proposal text as part of proposal title")
@@ -773,7 +1219,7 @@ def parse_proposals(ballot: BeautifulSoup, data: dict) -> int:
                     log.debug(f"Cleaned text: {proposal['text']!r}")
                     count += 1
 
-        elif "proposalText" in item["class"]:
+        elif kind == "proposalText":
             label = _html_to_text(item)
             assert proposal is not None, f"Proposal missing for text: {label}"
             proposal["text"] = label
@@ -6,6 +6,7 @@ import log
 from django.core.management.base import BaseCommand
 
 from elections import defaults, helpers
+from elections.commands import update_glossary
 from elections.models import Candidate, District, DistrictCategory, Position
 
 
@@ -26,6 +27,8 @@ class Command(BaseCommand):
         self.import_descriptions()
         self.export_descriptions()
 
+        update_glossary()
+
     def update_jurisdictions(self):
         jurisdiction = DistrictCategory.objects.get(name="Jurisdiction")
         for district in District.objects.filter(category=jurisdiction):
@@ -7,7 +7,7 @@ import bugsnag
 import log
 from django.core.management.base import BaseCommand
 
-from elections.commands import parse_ballots
+from elections.commands import parse_ballots, update_glossary
 
 
 class Command(BaseCommand):
@@ -25,17 +25,35 @@ class Command(BaseCommand):
             "--start-precinct",
             metavar="MVIC_ID",
             type=int,
+            default=None,
+            help="Initial Michigan SOS precinct ID to start from (resumes by default).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
             default=1,
-            help="Initial Michigan SOS precinct ID to start from.",
+            help="Number of processes to parse ballots in.",
         )
 
-    def handle(self, verbosity: int, election: int | None, start_precinct: int, **_kwargs):  # type: ignore
+    def handle(  # type: ignore
+        self,
+        verbosity: int,
+        election: int | None,
+        start_precinct: int | None,
+        workers: int,
+        **_kwargs,
+    ):
         log.reset()
         log.silence("datafiles")
         log.init(reset=True, verbosity=verbosity if "-v" in sys.argv[-1] else 2)
 
         try:
-            parse_ballots(election_id=election, starting_precinct_id=start_precinct)
+            parse_ballots(
+                election_id=election,
+                starting_precinct_id=start_precinct,
+                workers=workers,
+            )
+            update_glossary()
         except Exception as e:
             if "HEROKU_APP_NAME" in os.environ:
                 log.error("Unable to finish parsing data", exc_info=e)
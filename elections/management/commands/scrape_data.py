@@ -7,7 +7,7 @@ import bugsnag
 import log
 from django.core.management.base import BaseCommand
 
-from elections.commands import scrape_ballots, update_elections
+from elections.commands import refresh_ballots, scrape_ballots, update_elections
 
 
 class Command(BaseCommand):
@@ -25,8 +25,8 @@ class Command(BaseCommand):
             "--start-precinct",
             metavar="MVIC_ID",
             type=int,
-            default=1,
-            help="Initial Michigan SOS precinct ID to start from.",
+            default=None,
+            help="Initial Michigan SOS precinct ID to start from (resumes by default).",
         )
         parser.add_argument(
             "--ballot-limit",
@@ -34,13 +34,42 @@ class Command(BaseCommand):
             type=int,
             help="Maximum number of fetches to perform before stopping.",
         )
+        parser.add_argument(
+            "--workers",
+            metavar="COUNT",
+            type=int,
+            default=1,
+            help="Number of ballots to fetch concurrently.",
+        )
+        parser.add_argument(
+            "--processes",
+            metavar="COUNT",
+            type=int,
+            default=0,
+            help="Number of processes to parse ballots in.",
+        )
+        parser.add_argument(
+            "--discover",
+            action="store_true",
+            help="Probe precinct IDs known from previous elections first.",
+        )
+        parser.add_argument(
+            "--refresh-budget",
+            metavar="COUNT",
+            type=int,
+            help="Refetch up to this many scheduled ballots instead of crawling.",
+        )
 
     def handle(  # type: ignore
         self,
         verbosity: int,
         start_election: int | None,
-        start_precinct: int,
+        start_precinct: int | None,
         ballot_limit: int | None,
+        workers: int,
+        processes: int,
+        discover: bool,
+        refresh_budget: int | None,
         **_kwargs,
     ):
         log.reset()
@@ -49,11 +78,19 @@ class Command(BaseCommand):
 
         try:
             update_elections()
-            scrape_ballots(
-                starting_election_id=start_election,
-                starting_precinct_id=start_precinct,
-                ballot_limit=ballot_limit,
-            )
+            if refresh_budget is not None:
+                refresh_ballots(
+                    budget=refresh_budget, workers=workers, processes=processes
+                )
+            else:
+                scrape_ballots(
+                    starting_election_id=start_election,
+                    starting_precinct_id=start_precinct,
+                    ballot_limit=ballot_limit,
+                    workers=workers,
+                    processes=processes,
+                    discover=discover,
+                )
         except Exception as e:
             if "HEROKU_APP_NAME" in os.environ:
                 log.error("Unable to finish scraping data", exc_info=e)
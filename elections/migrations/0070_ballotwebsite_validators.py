@@ -0,0 +1,28 @@
+# Generated by Django 5.0.14 on 2026-10-18 03:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("elections", "0069_alter_candidate_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ballotwebsite",
+            name="mvic_etag",
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name="ballotwebsite",
+            name="mvic_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="ballotwebsite",
+            name="mvic_last_modified",
+            field=models.CharField(blank=True, editable=False, max_length=50),
+        ),
+    ]
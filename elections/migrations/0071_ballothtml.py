@@ -0,0 +1,95 @@
+# Generated by Django 5.0.14 on 2026-10-18 05:12
+
+import hashlib
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+
+
+def compress_html(apps, schema_editor):
+    BallotHTML = apps.get_model("elections", "BallotHTML")
+    BallotWebsite = apps.get_model("elections", "BallotWebsite")
+
+    websites = BallotWebsite.objects.exclude(mvic_html="").only("id", "mvic_html")
+    contents, batch = {}, []
+    for website in websites.iterator(chunk_size=1000):
+        digest = hashlib.sha256(website.mvic_html.encode()).hexdigest()
+        if digest not in contents:
+            compressed = zlib.compress(website.mvic_html.encode())
+            contents[digest] = BallotHTML(digest=digest, compressed=compressed)
+        website.mvic_content_id = digest
+        batch.append(website)
+        if len(batch) >= 1000:
+            _save_chunk(BallotHTML, BallotWebsite, contents, batch)
+    _save_chunk(BallotHTML, BallotWebsite, contents, batch)
+
+
+def _save_chunk(BallotHTML, BallotWebsite, contents, websites):
+    with transaction.atomic():
+        BallotHTML.objects.bulk_create(contents.values(), ignore_conflicts=True)
+        BallotWebsite.objects.bulk_update(websites, ["mvic_content"])
+    contents.clear()
+    websites.clear()
+
+
+def decompress_html(apps, schema_editor):
+    BallotWebsite = apps.get_model("elections", "BallotWebsite")
+
+    websites = BallotWebsite.objects.exclude(mvic_content=None).select_related(
+        "mvic_content"
+    )
+    batch = []
+    for website in websites.iterator(chunk_size=1000):
+        website.mvic_html = zlib.decompress(website.mvic_content.compressed).decode()
+        website.mvic_hash = website.mvic_content_id
+        batch.append(website)
+        if len(batch) >= 1000:
+            BallotWebsite.objects.bulk_update(batch, ["mvic_html", "mvic_hash"])
+            batch.clear()
+    BallotWebsite.objects.bulk_update(batch, ["mvic_html", "mvic_hash"])
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("elections", "0070_ballotwebsite_validators"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BallotHTML",
+            fields=[
+                (
+                    "digest",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("compressed", models.BinaryField()),
+            ],
+            options={
+                "verbose_name": "Ballot HTML",
+                "verbose_name_plural": "Ballot HTML",
+            },
+        ),
+        migrations.AddField(
+            model_name="ballotwebsite",
+            name="mvic_content",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                to="elections.ballothtml",
+            ),
+        ),
+        migrations.RunPython(compress_html, decompress_html),
+        migrations.RemoveField(
+            model_name="ballotwebsite",
+            name="mvic_hash",
+        ),
+        migrations.RemoveField(
+            model_name="ballotwebsite",
+            name="mvic_html",
+        ),
+    ]
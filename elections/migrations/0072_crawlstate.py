@@ -0,0 +1,83 @@
+# Generated by Django 5.0.14 on 2026-10-18 04:20
+
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("elections", "0071_ballothtml"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CrawlState",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    model_utils.fields.AutoCreatedField(
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        verbose_name="created",
+                    ),
+                ),
+                (
+                    "modified",
+                    model_utils.fields.AutoLastModifiedField(
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        verbose_name="modified",
+                    ),
+                ),
+                (
+                    "task",
+                    models.CharField(
+                        choices=[("scrape", "Scrape"), ("parse", "Parse")],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "mvic_election_id",
+                    models.PositiveIntegerField(verbose_name="MVIC Election ID"),
+                ),
+                (
+                    "last_precinct_id",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Last precinct whose results were saved",
+                        verbose_name="Last MVIC Precinct ID",
+                    ),
+                ),
+                (
+                    "frontier",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Highest precinct ID with a valid ballot"
+                    ),
+                ),
+                (
+                    "error_count",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Consecutive precincts without a valid ballot",
+                    ),
+                ),
+                ("ballot_count", models.PositiveIntegerField(default=0)),
+                ("finished", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "ordering": ["-mvic_election_id", "task"],
+                "unique_together": {("task", "mvic_election_id")},
+            },
+        ),
+    ]
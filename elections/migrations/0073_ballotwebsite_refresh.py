@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-18 04:31
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def schedule_refreshes(apps, schema_editor):
+    BallotWebsite = apps.get_model("elections", "BallotWebsite")
+    BallotWebsite.objects.exclude(last_fetch=None).update(
+        refresh_due=models.F("last_fetch") + timedelta(weeks=1)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("elections", "0072_crawlstate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ballotwebsite",
+            name="churn",
+            field=models.FloatField(
+                default=0,
+                editable=False,
+                help_text="Recent rate of changes between fetches",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ballotwebsite",
+            name="refresh_due",
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(schedule_refreshes, migrations.RunPython.noop),
+    ]
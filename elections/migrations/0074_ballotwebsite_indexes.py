@@ -0,0 +1,53 @@
+# Generated by Django 5.0.14 on 2026-10-18 04:44
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("elections", "0073_ballotwebsite_refresh"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ballotwebsite",
+            name="mvic_election_id",
+            field=models.PositiveIntegerField(verbose_name="MVIC Election ID"),
+        ),
+        migrations.AlterField(
+            model_name="ballotwebsite",
+            name="mvic_precinct_id",
+            field=models.PositiveIntegerField(verbose_name="MVIC Precinct ID"),
+        ),
+        migrations.AlterField(
+            model_name="ballotwebsite",
+            name="refresh_due",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name="ballotwebsite",
+            index=models.Index(
+                fields=["mvic_election_id", "valid"], name="website_election_valid_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="ballotwebsite",
+            index=models.Index(
+                condition=models.Q(("valid", True)),
+                fields=["mvic_election_id", "mvic_precinct_id"],
+                name="website_valid_precinct_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="ballotwebsite",
+            index=models.Index(
+                condition=models.Q(("fetched", True)),
+                fields=["mvic_election_id", "refresh_due"],
+                name="website_refresh_due_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.0.14 on 2026-10-18 04:48
+
+from django.db import migrations, models
+
+
+def copy_website_fields(apps, schema_editor):
+    Ballot = apps.get_model("elections", "Ballot")
+
+    ballots = Ballot.objects.select_related("website").only(
+        "id",
+        "website__mvic_election_id",
+        "website__mvic_precinct_id",
+        "website__data",
+    )
+    fields = ["mvic_election_id", "mvic_precinct_id", "item_count"]
+    batch = []
+    for ballot in ballots.iterator(chunk_size=1000):
+        website = ballot.website
+        ballot.mvic_election_id = website.mvic_election_id
+        ballot.mvic_precinct_id = website.mvic_precinct_id
+        ballot.item_count = -1
+        if website.data:
+            ballot.item_count = sum(
+                len(category)
+                for section in website.data.get("ballot", {}).values()
+                for category in section.values()
+            )
+        batch.append(ballot)
+        if len(batch) >= 1000:
+            Ballot.objects.bulk_update(batch, fields)
+            batch.clear()
+    Ballot.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("elections", "0074_ballotwebsite_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ballot",
+            name="item_count",
+            field=models.IntegerField(default=-1, editable=False),
+        ),
+        migrations.AddField(
+            model_name="ballot",
+            name="mvic_election_id",
+            field=models.PositiveIntegerField(
+                editable=False, null=True, verbose_name="MVIC Election ID"
+            ),
+        ),
+        migrations.AddField(
+            model_name="ballot",
+            name="mvic_precinct_id",
+            field=models.PositiveIntegerField(
+                editable=False, null=True, verbose_name="MVIC Precinct ID"
+            ),
+        ),
+        migrations.RunPython(copy_website_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="ballot",
+            index=models.Index(
+                fields=["mvic_election_id", "mvic_precinct_id"], name="ballot_mvic_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.14 on 2026-10-18 05:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("elections", "0075_ballot_mvic_ids"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="crawlstate",
+            name="discovering",
+            field=models.BooleanField(
+                default=False,
+                help_text="Precincts are probed out of order, so the last one is not saved",
+            ),
+        ),
+    ]
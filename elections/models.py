@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-import random
-from datetime import timedelta
-from typing import Any
+import time
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from functools import cached_property
+from typing import Any, Iterable
 
 import log
 import pendulum
 from django.conf import settings
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from model_utils.models import TimeStampedModel
 
@@ -189,15 +193,16 @@ class RegistrationStatus(models.Model):
     precinct = models.ForeignKey(Precinct, null=True, on_delete=models.SET_NULL)
 
     districts: list[District] = []  # not M2M because model is never saved
+    fetched: datetime | None = None  # when the data was last loaded from MVIC
 
-    def __init__(self, *args, districts=None, **kwargs):
+    def __init__(self, *args, districts=None, fetched=None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.fetched = fetched
 
         if self.ballot_url:
             *_, precinct_id, election_id = self.ballot_url.strip("/").split("/")
             self.ballots = Ballot.objects.filter(
-                website__mvic_election_id=election_id,
-                website__mvic_precinct_id=precinct_id,
+                mvic_election_id=election_id, mvic_precinct_id=precinct_id
             )
 
         self.districts = districts or []
@@ -253,10 +258,10 @@ class Voter(models.Model):
         return self.birth_date.year
 
     def fetch_registration_status(self) -> RegistrationStatus:
-        data = helpers.fetch_registration_status_data(self)
+        data, fetched = helpers.get_registration_status_data(self)
 
         if not data["registered"]:
-            return RegistrationStatus(registered=False)
+            return RegistrationStatus(registered=False, fetched=fetched)
 
         districts: list[District] = []
         county = jurisdiction = None
@@ -310,6 +315,7 @@ class Voter(models.Model):
             recently_moved=data["recently_moved"],
             precinct=precinct,
             districts=districts,
+            fetched=fetched,
         )
 
         return status
@@ -352,17 +358,72 @@ class Party(TimeStampedModel):
         return self.name
 
 
+class BallotHTML(models.Model):
+    """Compressed HTML shared by every ballot website with identical content."""
+
+    digest = models.CharField(max_length=64, primary_key=True)
+    compressed = models.BinaryField()
+
+    class Meta:
+        verbose_name = "Ballot HTML"
+        verbose_name_plural = "Ballot HTML"
+
+    def __str__(self) -> str:
+        return self.digest
+
+    @classmethod
+    def compress(cls, html: str) -> BallotHTML:
+        content = cls(
+            digest=helpers.hash_html(html), compressed=zlib.compress(html.encode())
+        )
+        content.__dict__["html"] = html
+        return content
+
+    @classmethod
+    def store(cls, websites: Iterable[BallotWebsite]) -> None:
+        """Insert new content referenced by unsaved websites."""
+        contents = {}
+        for website in websites:
+            if BallotWebsite.mvic_content.is_cached(website):
+                content = website.mvic_content
+                if content and content._state.adding:
+                    contents[content.digest] = content
+        if contents:
+            cls.objects.bulk_create(contents.values(), ignore_conflicts=True)
+
+    @classmethod
+    def purge_unreferenced(cls, *, chunk_size: int = 5000) -> int:
+        """Delete content no longer referenced by any ballot website."""
+        websites = BallotWebsite.objects.filter(mvic_content=models.OuterRef("pk"))
+        orphans = cls.objects.filter(~models.Exists(websites))
+
+        count = 0
+        while True:
+            chunk = cls.objects.filter(digest__in=orphans.values("digest")[:chunk_size])
+            deleted = chunk._raw_delete(chunk.db)  # pylint: disable=protected-access
+            if not deleted:
+                break
+            count += deleted
+            log.info(f"Deleted {count} unreferenced ballot HTML row(s)")
+
+        return count
+
+    @cached_property
+    def html(self) -> str:
+        return zlib.decompress(self.compressed).decode()
+
+
 class BallotWebsite(models.Model):
     """Raw HTML of potential ballot from the MVIC website."""
 
-    mvic_election_id = models.PositiveIntegerField(
-        verbose_name="MVIC Election ID", db_index=True
-    )
-    mvic_precinct_id = models.PositiveIntegerField(
-        verbose_name="MVIC Precinct ID", db_index=True
-    )
+    mvic_election_id = models.PositiveIntegerField(verbose_name="MVIC Election ID")
+    mvic_precinct_id = models.PositiveIntegerField(verbose_name="MVIC Precinct ID")
 
-    mvic_html = models.TextField(blank=True, editable=False)
+    mvic_content = models.ForeignKey(
+        BallotHTML, null=True, on_delete=models.PROTECT, editable=False
+    )
+    mvic_etag = models.CharField(max_length=200, blank=True, editable=False)
+    mvic_last_modified = models.CharField(max_length=50, blank=True, editable=False)
 
     fetched = models.BooleanField(default=False, editable=False)
     valid = models.BooleanField(null=True, editable=False)
@@ -377,18 +438,98 @@ class BallotWebsite(models.Model):
     last_convert = models.DateTimeField(null=True, editable=False)
     last_parse = models.DateTimeField(null=True, editable=False)
 
+    churn = models.FloatField(
+        default=0, editable=False, help_text="Recent rate of changes between fetches"
+    )
+    refresh_due = models.DateTimeField(null=True, editable=False)
+
+    FETCH_FIELDS = [
+        "fetched",
+        "last_fetch",
+        "mvic_etag",
+        "mvic_last_modified",
+        "churn",
+        "refresh_due",
+    ]
+
+    REFRESH_INTERVAL = timedelta(weeks=1)
+    REFRESH_MINIMUM = timedelta(hours=4)
+
     class Meta:
         unique_together = ["mvic_election_id", "mvic_precinct_id"]
+        indexes = [
+            models.Index(
+                fields=["mvic_election_id", "valid"], name="website_election_valid_idx"
+            ),
+            models.Index(
+                fields=["mvic_election_id", "mvic_precinct_id"],
+                condition=models.Q(valid=True),
+                name="website_valid_precinct_idx",
+            ),
+            models.Index(
+                fields=["mvic_election_id", "refresh_due"],
+                condition=models.Q(fetched=True),
+                name="website_refresh_due_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.mvic_url
 
+    @classmethod
+    def purge_invalid(cls, election_id: int, *, chunk_size: int = 5000) -> int:
+        """Delete an election's invalid websites in short, separate statements.
+
+        Websites still attached to a ballot are deleted through the ORM so the
+        ballot cascades, but the rest have no dependents and are removed with
+        raw chunked deletes that avoid loading and collecting every row.
+        """
+        websites = cls.objects.filter(mvic_election_id=election_id, valid=False)
+        _total, counts = websites.exclude(ballot=None).delete()
+        count = counts.get(cls._meta.label, 0)
+
+        start = time.perf_counter()
+        while True:
+            chunk = cls.objects.filter(id__in=websites.values("id")[:chunk_size])
+            deleted = chunk._raw_delete(chunk.db)  # pylint: disable=protected-access
+            if not deleted:
+                break
+            count += deleted
+            elapsed = time.perf_counter() - start
+            log.info(
+                f"Deleted {count} invalid ballot website(s)"
+                f" at {count / elapsed:.0f} per second"
+            )
+
+        return count
+
     @property
     def mvic_url(self) -> str:
         return helpers.build_mvic_url(
             election_id=self.mvic_election_id, precinct_id=self.mvic_precinct_id
         )
 
+    @property
+    def item_count(self) -> int:
+        if not self.data:
+            return -1
+        count = 0
+        for section in self.data.get("ballot", {}).values():
+            for category in section.values():
+                count += len(category)
+        return count
+
+    @property
+    def mvic_html(self) -> str:
+        if self.mvic_content_id is None:
+            return ""
+        assert self.mvic_content
+        return self.mvic_content.html
+
+    @mvic_html.setter
+    def mvic_html(self, html: str) -> None:
+        self.mvic_content = BallotHTML.compress(html)
+
     @property
     def stale(self) -> bool:
         if not self.last_fetch:
@@ -405,28 +546,72 @@ class BallotWebsite(models.Model):
             log.info(f"Scraping logic is newer than last scrape: {self}")
             return True
 
-        hours = 18
-        age = timezone.now() - self.last_fetch
-        if age < timedelta(hours=hours):
-            log.debug(f"Ballot was scraped in the last {hours} hours: {self}")
+        if self.refresh_due and self.refresh_due > timezone.now():
+            log.debug(f"Ballot refresh is scheduled for {self.refresh_due}: {self}")
             return False
 
-        age_in_days = age.total_seconds() / 3600 / 24
-        weight = age_in_days / 14  # fetch once per week on average
-        log.debug(f"Ballot was scraped {round(age_in_days, 1)} days ago: {self}")
+        return True
+
+    @property
+    def outdated(self) -> bool:
+        if self.valid is None:
+            log.debug(f"Ballot HTML has never been validated: {self}")
+            return True
 
-        return weight > random.random()
+        if self.valid and (
+            not self.last_scrape or self.last_scrape < constants.SCRAPER_LAST_UPDATED
+        ):
+            log.info(f"Scraping logic is newer than last scrape: {self}")
+            return True
 
-    def fetch(self) -> None:
-        """Fetch ballot HTML from the URL."""
-        self.mvic_html = helpers.fetch_ballot_html(self.mvic_url)
+        return False
+
+    def fetch(
+        self, page: tuple[str, str, str] | None = None, *, commit: bool = True
+    ) -> bool:
+        """Fetch ballot HTML from the URL and report if it changed."""
+        if page is None:
+            page = helpers.fetch_ballot_html(
+                self.mvic_url, self.mvic_etag, self.mvic_last_modified
+            )
+        html, self.mvic_etag, self.mvic_last_modified = page
 
         self.fetched = True
         self.last_fetch = timezone.now()
 
-        self.save()
+        changed = False
+        if html and helpers.hash_html(html) != self.mvic_content_id:
+            self.mvic_html = html
+            changed = True
+        if not changed:
+            log.info(f"Ballot HTML is unchanged: {self}")
+
+        if commit:
+            self.save(update_fields=None if changed else self.FETCH_FIELDS)
+
+        return changed
+
+    def schedule(self, election_date: date | None = None, *, changed: bool) -> None:
+        """Predict when the ballot is next likely to change.
+
+        Ballots that recently changed, either in validity or in the number of
+        parsed items, are refetched sooner, as are all ballots in the two weeks
+        before their election.
+        """
+        self.churn = self.churn / 2 + (0.5 if changed else 0.0)
+        likelihood = 0.1 + 0.9 * self.churn
+
+        urgency = 1.0
+        if election_date:
+            days = (election_date - timezone.localdate()).days
+            if days >= 0:
+                urgency += 14 / max(days, 1)
+
+        interval = self.REFRESH_INTERVAL * 0.1 / (likelihood * urgency)
+        interval = max(interval, self.REFRESH_MINIMUM)
+        self.refresh_due = (self.last_fetch or timezone.now()) + interval
 
-    def validate(self) -> bool:
+    def validate(self, *, commit: bool = True) -> bool:
         """Determine if fetched HTML contains ballot information."""
         log.info(f"Validating ballot HTML: {self}")
         assert self.mvic_html, f"Ballot URL has not been fetched: {self}"
@@ -443,21 +628,21 @@ class BallotWebsite(models.Model):
             self.valid = True
             self.last_validate = timezone.now()
 
-        self.save()
+        if commit:
+            self.save()
 
         return self.valid
 
-    def scrape(self) -> int:
-        """Scrape ballot data from the HTML."""
+    def scrape(
+        self, result: tuple[dict, int] | None = None, *, commit: bool = True
+    ) -> int:
+        """Scrape ballot data from the HTML, unless it was parsed elsewhere."""
         log.info(f"Scraping data from ballot: {self}")
         assert self.valid, f"Ballot HTML has not been validated: {self}"
 
-        data: dict[str, Any] = {}
-        data["election"] = helpers.parse_election(self.mvic_html)
-        data["precinct"] = helpers.parse_precinct(self.mvic_html, self.mvic_url)
-        data["ballot"] = {}
-
-        data_count = helpers.parse_ballot(self.mvic_html, data["ballot"])
+        if result is None:
+            result = helpers.parse_website(self.mvic_html, self.mvic_url)
+        data, data_count = result
         log.info(f"Ballot HTML contains {data_count} parsed item(s)")
         if data_count > 0:
             self.data = data
@@ -466,11 +651,13 @@ class BallotWebsite(models.Model):
 
         self.data_count = data_count
         self.last_scrape = timezone.now()
-        self.save()
+
+        if commit:
+            self.save()
 
         return self.data_count
 
-    def convert(self) -> Ballot:
+    def convert(self, *, commit: bool = True) -> Ballot:
         """Convert parsed ballot data into a ballot."""
         log.info(f"Converting to a ballot: {self}")
         assert self.data, f"Ballot data has not been scraped: {self}"
@@ -480,10 +667,15 @@ class BallotWebsite(models.Model):
         ballot = self._get_ballot(election, precinct)
         self.last_convert = timezone.now()
 
-        self.save()
+        if commit:
+            self.save()
 
         return ballot
 
+    def save(self, *args, **kwargs):
+        BallotHTML.store([self])
+        super().save(*args, **kwargs)
+
     def _get_election(self) -> Election:
         election_name, election_date = self.data["election"]
 
@@ -527,13 +719,105 @@ class BallotWebsite(models.Model):
 
     def _get_ballot(self, election: Election, precinct: Precinct) -> Ballot:
         ballot, created = Ballot.objects.get_or_create(
-            website=self, defaults=dict(election=election, precinct=precinct)
+            website=self,
+            defaults=dict(
+                election=election,
+                precinct=precinct,
+                mvic_election_id=self.mvic_election_id,
+                mvic_precinct_id=self.mvic_precinct_id,
+                item_count=self.item_count,
+            ),
         )
         if created:
             log.info(f"Created ballot: {ballot}")
+        else:
+            ballot.website = self
+            ballot.update_website_fields()
         return ballot
 
 
+class CrawlState(TimeStampedModel):
+    """Checkpoint for resuming an interrupted scrape or parse of an election."""
+
+    SCRAPE = "scrape"
+    PARSE = "parse"
+
+    task = models.CharField(
+        max_length=10, choices=[(SCRAPE, "Scrape"), (PARSE, "Parse")]
+    )
+    mvic_election_id = models.PositiveIntegerField(verbose_name="MVIC Election ID")
+
+    last_precinct_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Last MVIC Precinct ID",
+        help_text="Last precinct whose results were saved",
+    )
+    frontier = models.PositiveIntegerField(
+        default=0, help_text="Highest precinct ID with a valid ballot"
+    )
+    error_count = models.PositiveIntegerField(
+        default=0, help_text="Consecutive precincts without a valid ballot"
+    )
+    ballot_count = models.PositiveIntegerField(default=0)
+    discovering = models.BooleanField(
+        default=False,
+        help_text="Precincts are probed out of order, so the last one is not saved",
+    )
+
+    finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ["task", "mvic_election_id"]
+        ordering = ["-mvic_election_id", "task"]
+
+    def __str__(self) -> str:
+        return f"{self.get_task_display()} election {self.mvic_election_id}"
+
+    @classmethod
+    def start(cls, task: str, election_id: int) -> CrawlState:
+        """Resume an unfinished run or reset the checkpoint for a new one."""
+        state, _created = cls.objects.get_or_create(
+            task=task, mvic_election_id=election_id
+        )
+        if state.finished:
+            state.reset()
+        elif state.discovering:
+            log.info(f"Resuming discovery: {state}")
+        elif state.last_precinct_id:
+            log.info(f"Resuming after precinct {state.last_precinct_id}: {state}")
+        return state
+
+    def reset(self) -> None:
+        self.last_precinct_id = self.frontier = 0
+        self.error_count = self.ballot_count = 0
+        self.discovering = False
+        self.finished = None
+        self.save()
+
+    @classmethod
+    def get_unfinished(cls, task: str, *, after: int = 0) -> CrawlState | None:
+        """Find the earliest interrupted run of a known election after an ID.
+
+        Runs that only probed for upcoming elections have no matching election
+        and are skipped, so they cannot pull the crawl past the current one.
+        """
+        elections = Election.objects.filter(mvic_id__gt=after).values("mvic_id")
+        return (
+            cls.objects.filter(
+                Q(last_precinct_id__gt=0) | Q(discovering=True),
+                task=task,
+                finished=None,
+                mvic_election_id__in=elections,
+            )
+            .order_by("mvic_election_id")
+            .first()
+        )
+
+    def finish(self) -> None:
+        self.finished = timezone.now()
+        self.save()
+
+
 class Ballot(TimeStampedModel):
     """Full ballot bound to a particular polling location."""
 
@@ -541,8 +825,23 @@ class Ballot(TimeStampedModel):
     precinct = models.ForeignKey(Precinct, on_delete=models.CASCADE)
     website = models.OneToOneField(BallotWebsite, on_delete=models.CASCADE)
 
+    mvic_election_id = models.PositiveIntegerField(
+        null=True, editable=False, verbose_name="MVIC Election ID"
+    )
+    mvic_precinct_id = models.PositiveIntegerField(
+        null=True, editable=False, verbose_name="MVIC Precinct ID"
+    )
+    item_count = models.IntegerField(default=-1, editable=False)
+
+    WEBSITE_FIELDS = ["mvic_election_id", "mvic_precinct_id", "item_count"]
+
     class Meta:
         ordering = ["election__date"]
+        indexes = [
+            models.Index(
+                fields=["mvic_election_id", "mvic_precinct_id"], name="ballot_mvic_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return " | ".join(self.mvic_name)
@@ -553,10 +852,29 @@ class Ballot(TimeStampedModel):
 
     @property
     def mvic_url(self) -> str | None:
+        if self.mvic_election_id and self.mvic_precinct_id:
+            return helpers.build_mvic_url(
+                election_id=self.mvic_election_id, precinct_id=self.mvic_precinct_id
+            )
         if self.website:
             return self.website.mvic_url
         return None
 
+    def update_website_fields(self, *, commit: bool = True) -> bool:
+        """Copy lookup fields from the website so reads can skip loading it."""
+        assert self.website
+        changed = []
+        for name in self.WEBSITE_FIELDS:
+            value = getattr(self.website, name)
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                changed.append(name)
+
+        if changed and commit:
+            self.save(update_fields=[*changed, "modified"])
+
+        return bool(changed)
+
     @property
     def stale(self) -> bool:
         assert self.website
@@ -576,30 +894,38 @@ class Ballot(TimeStampedModel):
 
         return True
 
-    def parse(self) -> int:
+    def parse(self, cache: ParseCache | None = None) -> int:
         log.info(f"Parsing ballot: {self}")
         assert (
             self.website and self.website.data
         ), f"Ballot website has not been converted: {self}"
 
+        batched = cache is not None
+        if cache is None:
+            cache = ParseCache()
+
         count = 0
         for section_name, section_data in self.website.data["ballot"].items():
             section_parser = getattr(self, "_parse_" + section_name.replace(" ", "_"))
-            for item in section_parser(section_data):
+            for item in section_parser(section_data, cache):
                 if isinstance(item, (Candidate, Proposal)):
                     count += 1
 
+        if not batched:
+            cache.flush()
+
+        self.update_website_fields()
         self.website.parsed = True
         self.website.last_parse = timezone.now()
         self.website.save()
 
         return count
 
-    def _parse_primary_section(self, data):
+    def _parse_primary_section(self, data, cache: ParseCache):
         for section_name, section_data in data.items():
-            yield from self._parse_partisan_section(section_data, section_name)
+            yield from self._parse_partisan_section(section_data, cache, section_name)
 
-    def _parse_partisan_section(self, data, section=""):
+    def _parse_partisan_section(self, data, cache: ParseCache, section=""):
         assert self.website
 
         for category_name, positions_data in data.items():
@@ -613,7 +939,7 @@ class Ballot(TimeStampedModel):
                     "State Board",
                     "State Boards",
                 }:
-                    district = District.objects.get(name="Michigan")
+                    district = cache.get(District, name="Michigan")
                 elif category_name in {
                     "City",
                     "Township",
@@ -622,7 +948,7 @@ class Ballot(TimeStampedModel):
                 elif category_name in {
                     "Ward",
                 }:
-                    category = DistrictCategory.objects.get(name=category_name)
+                    category = cache.get(DistrictCategory, name=category_name)
                 elif category_name in {
                     "Congressional",
                     "Legislative",
@@ -636,7 +962,8 @@ class Ballot(TimeStampedModel):
                     )
 
                 if category and category.name == "Ward":
-                    district, created = District.objects.get_or_create(
+                    district, created = cache.get_or_create(
+                        District,
                         category=category,
                         name=self.precinct.get_ward_label(position_data),
                     )
@@ -645,32 +972,33 @@ class Ballot(TimeStampedModel):
 
                 if district is None:
                     if position_name in {"United States Senator"}:
-                        district = District.objects.get(name="Michigan")
+                        district = cache.get(District, name="Michigan")
                     elif position_name in {"Representative in Congress"}:
-                        category = DistrictCategory.objects.get(name="US Congress")
-                        district, created = District.objects.get_or_create(
-                            category=category, name=position_data["district"]
+                        category = cache.get(DistrictCategory, name="US Congress")
+                        district, created = cache.get_or_create(
+                            District, category=category, name=position_data["district"]
                         )
                         if created:
                             log.info(f"Created district: {district}")
                     elif position_name in {"State Senator"}:
-                        category = DistrictCategory.objects.get(name="State Senate")
-                        district, created = District.objects.get_or_create(
-                            category=category, name=position_data["district"]
+                        category = cache.get(DistrictCategory, name="State Senate")
+                        district, created = cache.get_or_create(
+                            District, category=category, name=position_data["district"]
                         )
                         if created:
                             log.info(f"Created district: {district}")
                     elif position_name in {"Representative in State Legislature"}:
-                        category = DistrictCategory.objects.get(name="State House")
-                        district, created = District.objects.get_or_create(
-                            category=category, name=position_data["district"]
+                        category = cache.get(DistrictCategory, name="State House")
+                        district, created = cache.get_or_create(
+                            District, category=category, name=position_data["district"]
                         )
                         if created:
                             log.info(f"Created district: {district}")
 
                     elif position_name in {"County Commissioner"}:
-                        category = DistrictCategory.objects.get(name=position_name)
-                        district, created = District.objects.get_or_create(
+                        category = cache.get(DistrictCategory, name=position_name)
+                        district, created = cache.get_or_create(
+                            District,
                             category=category,
                             name=self.precinct.get_county_district_label(
                                 position_data["district"]
@@ -679,8 +1007,9 @@ class Ballot(TimeStampedModel):
                         if created:
                             log.info(f"Created district: {district}")
                     elif position_name in {"Delegate to County Convention"}:
-                        category = DistrictCategory.objects.get(name="Precinct")
-                        district, created = District.objects.get_or_create(
+                        category = cache.get(DistrictCategory, name="Precinct")
+                        district, created = cache.get_or_create(
+                            District,
                             category=category,
                             name=self.precinct.get_precinct_label(),
                         )
@@ -694,7 +1023,8 @@ class Ballot(TimeStampedModel):
                         )
 
                 default_term = constants.TERMS.get(position_data["name"], "")
-                position, created = Position.objects.get_or_create(
+                position, created = cache.get_or_create(
+                    Position,
                     election=self.election,
                     district=district,
                     name=position_data["name"],
@@ -704,9 +1034,7 @@ class Ballot(TimeStampedModel):
                 )
                 if created:
                     log.info(f"Created position: {position}")
-                position.ballots.add(self)
-                position.precincts.add(self.precinct)
-                position.save()
+                cache.link(position, self)
                 yield position
 
                 for candidate_data in position_data["candidates"]:
@@ -721,8 +1049,9 @@ class Ballot(TimeStampedModel):
                             f"Expected party for {candidate_name!r} on {self.website.mvic_url}"
                         )
 
-                    party = Party.objects.get(name=candidate_data["party"])
-                    candidate, created = Candidate.objects.update_or_create(
+                    party = cache.get(Party, name=candidate_data["party"])
+                    candidate, created = cache.update_or_create(
+                        Candidate,
                         position=position,
                         name=candidate_name,
                         defaults={
@@ -734,7 +1063,7 @@ class Ballot(TimeStampedModel):
                         log.info(f"Created candidate: {candidate}")
                     yield candidate
 
-    def _parse_nonpartisan_section(self, data: dict):
+    def _parse_nonpartisan_section(self, data: dict, cache: ParseCache):
         assert self.website
 
         for category_name, positions_data in data.items():
@@ -763,7 +1092,7 @@ class Ballot(TimeStampedModel):
                     "Library",
                     "Ward",
                 }:
-                    category = DistrictCategory.objects.get(name=category_name)
+                    category = cache.get(DistrictCategory, name=category_name)
                 elif category_name in {"Judicial"}:
                     pass  # district will be parsed based on position name
                 else:
@@ -772,7 +1101,8 @@ class Ballot(TimeStampedModel):
                     )
 
                 if category and category.name == "Ward":
-                    district, created = District.objects.get_or_create(
+                    district, created = cache.get_or_create(
+                        District,
                         category=category,
                         name=self.precinct.get_ward_label(position_data),
                     )
@@ -782,29 +1112,25 @@ class Ballot(TimeStampedModel):
                 if district is None:
                     if category is None:
                         if position_name in {"Justice of Supreme Court"}:
-                            district = District.objects.get(name="Michigan")
+                            district = cache.get(District, name="Michigan")
                         elif position_name in {"Judge of Court of Appeals"}:
-                            category = DistrictCategory.objects.get(
-                                name="Court of Appeals"
+                            category = cache.get(
+                                DistrictCategory, name="Court of Appeals"
                             )
                         elif position_name in {"Judge of Municipal Court"}:
-                            category = DistrictCategory.objects.get(
-                                name="Municipal Court"
+                            category = cache.get(
+                                DistrictCategory, name="Municipal Court"
                             )
                         elif position_name in {
                             "Judge of Probate Court",
                             "Judge of Probate District Court",
                         }:
-                            category = DistrictCategory.objects.get(
-                                name="Probate Court"
-                            )
+                            category = cache.get(DistrictCategory, name="Probate Court")
                         elif position_name in {"Judge of Circuit Court"}:
-                            category = DistrictCategory.objects.get(
-                                name="Circuit Court"
-                            )
+                            category = cache.get(DistrictCategory, name="Circuit Court")
                         elif position_name in {"Judge of District Court"}:
-                            category = DistrictCategory.objects.get(
-                                name="District Court"
+                            category = cache.get(
+                                DistrictCategory, name="District Court"
                             )
                         else:
                             raise exceptions.UnhandledData(
@@ -812,8 +1138,8 @@ class Ballot(TimeStampedModel):
                             )
 
                     if position_data["district"]:
-                        district, created = District.objects.get_or_create(
-                            category=category, name=position_data["district"]
+                        district, created = cache.get_or_create(
+                            District, category=category, name=position_data["district"]
                         )
                         if created:
                             log.info(f"Created district: {district}")
@@ -824,7 +1150,8 @@ class Ballot(TimeStampedModel):
                         district = self.precinct.jurisdiction
 
                 parts = [position_data["type"] or "", position_data["term"] or ""]
-                position, created = Position.objects.get_or_create(
+                position, created = cache.get_or_create(
+                    Position,
                     election=self.election,
                     district=district,
                     name=position_data["name"],
@@ -833,16 +1160,17 @@ class Ballot(TimeStampedModel):
                 )
                 if created:
                     log.info(f"Created position: {position}")
-                position.section = "Nonpartisan"
-                position.ballots.add(self)
-                position.precincts.add(self.precinct)
-                position.save()
+                if position.section != "Nonpartisan":
+                    position.section = "Nonpartisan"
+                    position.save()
+                cache.link(position, self)
                 yield position
 
                 for candidate_data in position_data["candidates"]:
                     assert candidate_data["party"] is None
-                    party = Party.objects.get(name="Nonpartisan")
-                    candidate, created = Candidate.objects.update_or_create(
+                    party = cache.get(Party, name="Nonpartisan")
+                    candidate, created = cache.update_or_create(
+                        Candidate,
                         position=position,
                         name=candidate_data["name"],
                         defaults={
@@ -854,7 +1182,7 @@ class Ballot(TimeStampedModel):
                         log.info(f"Created candidate: {candidate}")
                     yield candidate
 
-    def _parse_proposal_section(self, data):
+    def _parse_proposal_section(self, data, cache: ParseCache):
         assert self.website
 
         for category_name, proposals_data in data.items():
@@ -863,7 +1191,7 @@ class Ballot(TimeStampedModel):
             if category_name in {
                 "State",
             }:
-                district = District.objects.get(name="Michigan")
+                district = cache.get(District, name="Michigan")
             elif category_name in {
                 "County",
             }:
@@ -884,7 +1212,7 @@ class Ballot(TimeStampedModel):
                 "District Library",
                 "Ward",
             }:
-                category = DistrictCategory.objects.get(name=category_name)
+                category = cache.get(DistrictCategory, name=category_name)
             else:
                 raise exceptions.UnhandledData(
                     f"Unhandled category {category_name!r} on {self.website.mvic_url}"
@@ -892,7 +1220,8 @@ class Ballot(TimeStampedModel):
 
             for proposal_data in proposals_data:
                 if category and category.name == "Ward":
-                    district, created = District.objects.get_or_create(
+                    district, created = cache.get_or_create(
+                        District,
                         category=category,
                         name=self.precinct.get_ward_label(proposal_data),
                     )
@@ -966,8 +1295,8 @@ class Ballot(TimeStampedModel):
                     else:
                         raise original_exception  # type: ignore
 
-                    district, created = District.objects.get_or_create(
-                        category=category, name=district_name
+                    district, created = cache.get_or_create(
+                        District, category=category, name=district_name
                     )
                     if created:
                         log.info(f"Created district: {district}")
@@ -977,7 +1306,8 @@ class Ballot(TimeStampedModel):
                         f"Proposal text missing on {self.website.mvic_url}"
                     )
 
-                proposal, created = Proposal.objects.update_or_create(
+                proposal, created = cache.update_or_create(
+                    Proposal,
                     election=self.election,
                     district=district,
                     name=proposal_data["title"],
@@ -985,9 +1315,7 @@ class Ballot(TimeStampedModel):
                 )
                 if created:
                     log.info(f"Created proposal: {proposal}")
-                proposal.ballots.add(self)
-                proposal.precincts.add(self.precinct)
-                proposal.save()
+                cache.link(proposal, self)
                 yield proposal
 
 
@@ -1087,3 +1415,125 @@ class Candidate(TimeStampedModel):
             assert (
                 self.party and self.party.name == "Nonpartisan"
             ), f"Candidates with nominations must be nonpartisan: {self}"
+
+
+class ParseCache:
+    """Ballot item lookups shared while parsing many ballots.
+
+    Rows are resolved from memory after the first lookup, so the database
+    is only queried for rows that have not been seen during this session.
+    """
+
+    batch_size = 1000
+
+    def __init__(self, election: Election | None = None):
+        self._rows: dict[type[models.Model], list[models.Model]] = {}
+        self._indexes: dict[tuple, dict[tuple, models.Model]] = {}
+        self._links: dict[tuple, set[tuple[int, int]]] = defaultdict(set)
+        self._link_count = 0
+        if election:
+            self.preload(election)
+
+    def preload(self, election: Election) -> None:
+        for queryset in [
+            DistrictCategory.objects.all(),
+            Party.objects.all(),
+            District.objects.filter(
+                models.Q(position__election=election)
+                | models.Q(proposal__election=election)
+            ).distinct(),
+            Position.objects.filter(election=election),
+            Proposal.objects.filter(election=election),
+            Candidate.objects.filter(position__election=election),
+        ]:
+            for row in queryset:
+                self._remember(row)
+
+    def get(self, model, **lookup):
+        index, key = self._lookup(model, lookup)
+        if key not in index:
+            row = model.objects.get(**lookup)
+            self._remember(row)
+            index[key] = row
+        return index[key]
+
+    def get_or_create(self, model, **lookup) -> tuple[Any, bool]:
+        index, key = self._lookup(model, lookup)
+        if key in index:
+            return index[key], False
+        row, created = model.objects.get_or_create(**lookup)
+        self._remember(row)
+        index[key] = row
+        return row, created
+
+    def update_or_create(self, model, defaults: dict, **lookup) -> tuple[Any, bool]:
+        index, key = self._lookup(model, lookup)
+        if key not in index:
+            row, created = model.objects.update_or_create(defaults=defaults, **lookup)
+            self._remember(row)
+            index[key] = row
+            return row, created
+
+        row = index[key]
+        changed = False
+        for name, value in defaults.items():
+            if self._key(row, (name,)) != self._key_values({name: value}):
+                setattr(row, name, value)
+                changed = True
+        if changed:
+            row.save()
+        return row, False
+
+    def link(self, item: BallotItem, ballot: Ballot) -> None:
+        """Queue the item's ballot and precinct links until the next flush."""
+        for name, related_id in [
+            ("ballots", ballot.pk),
+            ("precincts", ballot.precinct_id),
+        ]:
+            links = self._links[type(item), name]
+            if (item.pk, related_id) not in links:
+                links.add((item.pk, related_id))
+                self._link_count += 1
+        if self._link_count >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Insert queued links, skipping any that already exist."""
+        for (model, name), links in self._links.items():
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = field.m2m_column_name()
+            target = field.m2m_reverse_name()
+            through.objects.bulk_create(
+                [through(**{source: a, target: b}) for a, b in links],
+                ignore_conflicts=True,
+            )
+        self._links.clear()
+        self._link_count = 0
+
+    def _lookup(self, model, lookup: dict) -> tuple[dict, tuple]:
+        names = tuple(sorted(lookup))
+        index = self._indexes.get((model, names))
+        if index is None:
+            index = self._indexes[(model, names)] = {}
+            for row in self._rows.get(model, []):
+                index.setdefault(self._key(row, names), row)
+        return index, self._key_values(lookup)
+
+    def _remember(self, row: models.Model) -> None:
+        model = type(row)
+        self._rows.setdefault(model, []).append(row)
+        for (indexed_model, names), index in self._indexes.items():
+            if indexed_model is model:
+                index.setdefault(self._key(row, names), row)
+
+    @staticmethod
+    def _key_values(lookup: dict) -> tuple:
+        return tuple(
+            value.pk if isinstance(value, models.Model) else value
+            for _name, value in sorted(lookup.items())
+        )
+
+    @staticmethod
+    def _key(row: models.Model, names: tuple[str, ...]) -> tuple:
+        return tuple(getattr(row, row._meta.get_field(name).attname) for name in names)
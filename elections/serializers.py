@@ -68,9 +68,13 @@ class ElectionSerializer(serializers.ModelSerializer):
         return dt.format("dddd, MMMM Do")
 
     def get_proposals_count(self, instance: models.Election) -> int:
+        if hasattr(instance, "proposals_count"):
+            return instance.proposals_count
         return instance.proposal_set.count()
 
     def get_positions_count(self, instance: models.Election) -> int:
+        if hasattr(instance, "positions_count"):
+            return instance.positions_count
         return instance.position_set.count()
 
 
@@ -160,14 +164,7 @@ class NestedBallotSerializer(serializers.ModelSerializer):
         ]
 
     def get_items(self, instance: models.Ballot) -> int:
-        if not instance.website.data:
-            return -1
-        count = 0
-        ballot = instance.website.data.get("ballot", {})
-        for section in ballot.values():
-            for category in section.values():
-                count += len(category)
-        return count
+        return instance.item_count
 
 
 class ProposalSerializer(serializers.HyperlinkedModelSerializer):
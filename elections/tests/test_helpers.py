@@ -2,11 +2,19 @@
 
 
 import datetime
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
 
 import pendulum
 import pytest
+from django.core.cache import cache
+from django.utils import timezone
 
-from .. import helpers, models
+from .. import exceptions, helpers, models
 
 
 @pytest.fixture
@@ -30,7 +38,298 @@ def describe_normalize_position():
         expect(helpers.normalize_position(before)) == after
 
 
+def describe_tokenize_ballot():
+    def it_groups_typed_elements_by_innermost_section(expect):
+        ballot = helpers.build_soup(
+            """
+            <div>
+              <div id="twoPartyPrimaryElectionOffices">
+                <div id="columnOnePrimary">
+                  <div class="col-md-12 division">State</div>
+                  <div class="col-md-12 office">Governor</div>
+                </div>
+              </div>
+              <div id="proposals">
+                <div class="section">Proposal Section</div>
+                <span><div class="proposalTitle">Proposal 1</div></span>
+              </div>
+              <div class="office">Ignored</div>
+            </div>
+            """
+        ).div
+
+        tokens = helpers.tokenize_ballot(ballot)
+
+        expect(
+            {
+                key: [(kind, item.text) for kind, item in items]
+                for key, items in tokens.items()
+            }
+        ) == {
+            "twoPartyPrimaryElectionOffices": [],
+            "columnOnePrimary": [("division", "State"), ("office", "Governor")],
+            "proposals": [
+                ("section", "Proposal Section"),
+                ("proposalTitle", "Proposal 1"),
+            ],
+        }
+
+
+def describe_build_session():
+    def it_only_retries_ballot_pages(expect):
+        session = helpers.build_session()
+
+        ballots = session.get_adapter(helpers.build_mvic_url(698, 45167))
+        search = session.get_adapter(helpers.REGISTRATION_URL)
+
+        expect(ballots.max_retries.allowed_methods) == ["GET"]
+        expect(ballots.max_retries.read) == 0
+        expect(search.max_retries.total) == 1
+        expect(search.max_retries.read) == 0
+
+
+def describe_retry_budget():
+    def it_limits_retries_to_a_share_of_recent_requests(expect):
+        budget = helpers.RetryBudget(0.1)
+        for _ in range(20):
+            budget.record()
+
+        expect([budget.reserve() for _ in range(3)]) == [True, True, False]
+
+    def it_forgets_requests_outside_the_window(expect):
+        budget = helpers.RetryBudget(0.5, window=0.05, minimum=0)
+        for _ in range(4):
+            budget.record()
+        budget.reserve()
+        time.sleep(0.1)
+
+        expect(budget.reserve()) == False
+
+
+def describe_get_voter_key():
+    def it_ignores_case_and_birth_day(expect, voter):
+        other = models.Voter(
+            first_name="ROSALYNN",
+            last_name="bliss ",
+            birth_date=pendulum.parse("1975-08-31"),  # type: ignore[misc]
+            zip_code="49503",
+        )
+
+        expect(helpers.get_voter_key(other)) == helpers.get_voter_key(voter)
+
+
+def describe_coalesce():
+    @pytest.fixture(autouse=True)
+    def locked(shared_cache, settings):
+        settings.REGISTRATION_LOCK_SECONDS = 5
+
+    @pytest.fixture
+    def key():
+        return f"test:{uuid.uuid4()}"
+
+    def it_shares_one_call_between_concurrent_callers(expect, key):
+        calls = []
+
+        def lookup():
+            calls.append(None)
+            time.sleep(0.5)
+            return {"registered": True}
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(helpers.coalesce, key, lookup) for _ in range(5)]
+            results = [future.result() for future in futures]
+
+        expect(len(calls)) == 1
+        expect(results) == [{"registered": True}] * 5
+
+    def it_lets_the_next_caller_retry_after_a_failure(expect, key):
+        def lookup():
+            raise exceptions.ServiceUnavailable()
+
+        with expect.raises(exceptions.ServiceUnavailable):
+            helpers.coalesce(key, lookup)
+
+        expect(helpers.coalesce(key, lambda: {"registered": True})) == {
+            "registered": True
+        }
+
+    def it_takes_the_cache_lock_outside_the_process_lock(expect, key):
+        locked = []
+        add = cache.add
+
+        def spy(*args, **kwargs):
+            locked.append(helpers._flights_lock.locked())
+            return add(*args, **kwargs)
+
+        with patch.object(cache, "add", spy):
+            helpers.coalesce(key, lambda: {"registered": True})
+
+        expect(locked) == [False]
+
+    def it_polls_while_another_process_holds_the_lock(expect, key, settings):
+        settings.MVIC_LOOKUP_SECONDS = 0.2
+        cache.add(f"{key}:lock", True, 5)
+
+        with expect.raises(exceptions.ServiceUnavailable):
+            helpers.coalesce(key, lambda: {"registered": True})
+
+        expect(helpers._flights).excludes(key)
+
+
+def describe_get_registration_status_data():
+    @pytest.fixture(autouse=True)
+    def cached(shared_cache, settings):
+        settings.API_CACHE_SECONDS = 60
+        settings.API_STALE_SECONDS = 3600
+
+    @pytest.fixture
+    def stale(voter):
+        fetched = timezone.now() - datetime.timedelta(minutes=5)
+        cache.set(helpers.get_voter_key(voter), ({"registered": False}, fetched))
+        return fetched
+
+    def _wait_for(condition):
+        for _ in range(20):
+            if condition():
+                break
+            time.sleep(0.05)
+
+    def it_serves_stale_data_while_refreshing(expect, voter, stale):
+        with patch.object(
+            helpers,
+            "fetch_registration_status_data",
+            Mock(return_value={"registered": True}),
+        ):
+            data, fetched = helpers.get_registration_status_data(voter)
+            _wait_for(lambda: cache.get(helpers.get_voter_key(voter))[1] != stale)
+
+        expect(data) == {"registered": False}
+        expect(fetched) == stale
+        data, fetched = helpers.get_registration_status_data(voter)
+        expect(data) == {"registered": True}
+        expect(fetched) > stale
+
+    def it_refreshes_each_stale_entry_once(expect, voter, stale):
+        with patch.object(helpers.refresher, "submit") as submit:
+            for _ in range(3):
+                helpers.get_registration_status_data(voter)
+
+        expect(submit.call_count) == 1
+
+    def it_requests_ambiguous_pages_again_later(expect, voter, settings, monkeypatch):
+        settings.MVIC_RETRY_BACKOFF = 0
+        monkeypatch.setattr(helpers, "registration_stats", Counter())
+        monkeypatch.setattr(helpers, "retry_budget", helpers.RetryBudget(0.1))
+        key = helpers.get_voter_key(voter)
+
+        with patch.object(
+            helpers,
+            "fetch_registration_status_data",
+            Mock(side_effect=[{"registered": None}, {"registered": False}]),
+        ) as fetch:
+            data, _fetched = helpers.get_registration_status_data(voter)
+            _wait_for(lambda: cache.get(key) is not None)
+
+        expect(data) == {"registered": None}
+        expect(cache.get(key)[0]) == {"registered": False}
+        expect(fetch.call_count) == 2
+        expect(helpers.get_registration_stats()) == {"ambiguous": 1, "retries": 1}
+        expect(cache.get(f"{key}:retrying")) == None
+
+    def it_schedules_one_retry_for_coalesced_callers(
+        expect, voter, settings, monkeypatch
+    ):
+        settings.REGISTRATION_LOCK_SECONDS = 5
+        monkeypatch.setattr(helpers, "registration_stats", Counter())
+        monkeypatch.setattr(helpers, "lookup_slots", threading.BoundedSemaphore(5))
+
+        def lookup(voter):
+            time.sleep(0.2)
+            return {"registered": None}
+
+        with patch.object(helpers, "fetch_registration_status_data", lookup):
+            with patch.object(helpers, "_schedule_registration_retry") as schedule:
+                with ThreadPoolExecutor(max_workers=5) as executor:
+                    futures = [
+                        executor.submit(helpers.get_registration_status_data, voter)
+                        for _ in range(5)
+                    ]
+                    for future in futures:
+                        future.result()
+
+        expect(schedule.call_count) == 1
+        expect(helpers.get_registration_stats()) == {"ambiguous": 1}
+
+    def it_skips_retries_for_voters_already_being_retried(expect, voter, monkeypatch):
+        monkeypatch.setattr(helpers, "registration_stats", Counter())
+        cache.set(f"{helpers.get_voter_key(voter)}:retrying", True)
+
+        with patch.object(
+            helpers,
+            "fetch_registration_status_data",
+            Mock(return_value={"registered": None}),
+        ):
+            with patch.object(helpers.threading, "Timer") as timer:
+                helpers.get_registration_status_data(voter)
+
+        expect(timer.called) == False
+        expect(helpers.get_registration_stats()) == {"ambiguous": 1}
+
+    def it_rejects_lookups_when_every_slot_is_busy(expect, voter, monkeypatch):
+        monkeypatch.setattr(helpers, "lookup_slots", threading.BoundedSemaphore(1))
+        helpers.lookup_slots.acquire()
+
+        with patch.object(helpers, "fetch_registration_status_data") as fetch:
+            with expect.raises(exceptions.ServiceUnavailable):
+                helpers.get_registration_status_data(voter)
+
+        expect(fetch.called) == False
+
+    def it_serves_cached_data_when_every_slot_is_busy(
+        expect, voter, stale, monkeypatch
+    ):
+        monkeypatch.setattr(helpers, "lookup_slots", threading.BoundedSemaphore(1))
+        helpers.lookup_slots.acquire()
+
+        with patch.object(helpers.refresher, "submit") as submit:
+            data, fetched = helpers.get_registration_status_data(voter)
+
+        expect(data) == {"registered": False}
+        expect(fetched) == stale
+        expect(submit.called) == True
+
+    def it_keeps_stale_data_during_outages(expect, voter, stale):
+        with patch.object(
+            helpers,
+            "fetch_registration_status_data",
+            Mock(side_effect=exceptions.ServiceUnavailable),
+        ) as fetch:
+            helpers.get_registration_status_data(voter)
+            _wait_for(lambda: fetch.called)
+
+        expect(fetch.called) == True
+        expect(cache.get(helpers.get_voter_key(voter))) == (
+            {"registered": False},
+            stale,
+        )
+
+
 def describe_fetch_registration_status_data():
+    @pytest.fixture
+    def post(monkeypatch):
+        monkeypatch.setattr(helpers, "registration_stats", Counter())
+        post = Mock()
+        monkeypatch.setattr(helpers.session, "post", post)
+        return post
+
+    def it_gives_up_after_the_deadline(expect, voter, post, settings):
+        settings.MVIC_LOOKUP_SECONDS = 0
+
+        with expect.raises(exceptions.ServiceUnavailable):
+            helpers.fetch_registration_status_data(voter)
+
+        expect(post.called) == False
+
     @pytest.mark.vcr
     def with_known_voter(expect, voter):
         data = helpers.fetch_registration_status_data(voter)
@@ -1,10 +1,13 @@
 # pylint: disable=unused-variable,unused-argument,expression-not-assigned
 
 
+from datetime import timedelta
+
 import log
 import pendulum
 import pytest
 import time_machine
+from django.utils import timezone
 
 from .. import models
 
@@ -242,6 +245,44 @@ def describe_ballot_website():
                 website.mvic_url
             ) == "https://mvic.sos.state.mi.us/Voter/GetMvicBallot/1828/676/"
 
+    def describe_mvic_html():
+        @pytest.mark.django_db
+        def it_shares_compressed_content(expect):
+            html = "<div>Ballot is not available at this time.</div>" * 100
+            for precinct_id in [1, 2]:
+                website = models.BallotWebsite(
+                    mvic_election_id=676, mvic_precinct_id=precinct_id
+                )
+                website.mvic_html = html
+                website.save()
+
+            expect(models.BallotHTML.objects.count()) == 1
+            content = models.BallotHTML.objects.get()
+            expect(len(content.compressed)) < len(html)
+            website = models.BallotWebsite.objects.get(mvic_precinct_id=2)
+            expect(website.mvic_html) == html
+
+    def describe_schedule():
+        @time_machine.travel("2018-06-01", tick=False)
+        def it_refreshes_changing_ballots_sooner(expect, website):
+            website.schedule(changed=False)
+            stable = website.refresh_due
+
+            website.schedule(changed=True)
+
+            expect(website.refresh_due) < stable
+
+        @time_machine.travel("2018-06-01", tick=False)
+        def it_refreshes_ballots_sooner_near_the_election(expect, website, election):
+            website.schedule(changed=False)
+            far = website.refresh_due
+
+            election.date = pendulum.date(2018, 6, 3)
+            website.schedule(election.date, changed=False)
+
+            expect(website.refresh_due) < far
+            expect(website.refresh_due - timezone.now()) >= timedelta(hours=4)
+
     def describe_scrape():
         @pytest.mark.vcr
         @pytest.mark.django_db
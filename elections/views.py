@@ -4,12 +4,17 @@ from contextlib import suppress
 import log
 from django.conf import settings
 from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework import generics, viewsets
 from rest_framework.response import Response
 from rest_framework.throttling import UserRateThrottle
 
-from . import exceptions, filters, models, serializers
+from . import exceptions, filters, helpers, models, serializers
+from .commands import GLOSSARY_CACHE_KEY, update_glossary
 
 
 class CachedThrottle(UserRateThrottle):
@@ -21,7 +26,8 @@ class CachedThrottle(UserRateThrottle):
         return settings.API_CACHE_KEY
 
     def allow_request(self, request, view):
-        if cache.get(self.__class__.get_key(request, view)):
+        key = self.__class__.get_key(request)
+        if key and cache.get(key):
             return True
 
         return super().allow_request(request, view)
@@ -46,14 +52,20 @@ class CachedThrottle(UserRateThrottle):
         return num_requests, duration_in_seconds
 
     @staticmethod
-    def get_key(request, view):
-        return ":".join(
-            (
-                str(settings.API_CACHE_KEY),
-                view.__class__.__name__,
-                request.get_full_path(),
-            )
-        )
+    def get_key(request) -> str | None:
+        serializer = serializers.VoterSerializer(data=request.query_params)
+        if serializer.is_valid():
+            voter = models.Voter(**serializer.validated_data)
+            return helpers.get_voter_key(voter)
+        return None
+
+
+def _get_freshness(status: models.RegistrationStatus) -> dict[str, str]:
+    """Describe how old the MVIC data behind a response is."""
+    if status.fetched is None:
+        return {}
+    age = max(0, int((timezone.now() - status.fetched).total_seconds()))
+    return {"Age": str(age), "Last-Modified": http_date(status.fetched.timestamp())}
 
 
 class RegistrationViewSet(viewsets.ViewSetMixin, generics.ListAPIView):
@@ -70,11 +82,6 @@ class RegistrationViewSet(viewsets.ViewSetMixin, generics.ListAPIView):
     throttle_classes = [CachedThrottle]
 
     def list(self, request):  # pylint: disable=arguments-differ
-        if settings.API_CACHE_SECONDS:
-            key = CachedThrottle.get_key(request, self)
-            if value := cache.get(key):
-                return Response(*value)
-
         input_serializer = serializers.VoterSerializer(data=request.query_params)
         input_serializer.is_valid(raise_exception=True)
         voter = models.Voter(**input_serializer.validated_data)
@@ -83,11 +90,8 @@ class RegistrationViewSet(viewsets.ViewSetMixin, generics.ListAPIView):
         output_serializer = serializer_class(
             registration_status, context={"request": request}
         )
-
-        key = CachedThrottle.get_key(request, self)
-        data = output_serializer.data
-        cache.set(key, (data, 200), settings.API_CACHE_SECONDS)
-        return Response(data)
+        headers = _get_freshness(registration_status)
+        return Response(output_serializer.data, headers=headers)
 
 
 class StatusViewSet(viewsets.ViewSetMixin, generics.ListAPIView):
@@ -103,11 +107,6 @@ class StatusViewSet(viewsets.ViewSetMixin, generics.ListAPIView):
     throttle_classes = [CachedThrottle]
 
     def list(self, request):  # pylint: disable=arguments-differ
-        if settings.API_CACHE_SECONDS:
-            key = CachedThrottle.get_key(request, self)
-            if value := cache.get(key):
-                return Response(*value)
-
         input_serializer = serializers.VoterSerializer(data=request.query_params)
         input_serializer.is_valid(raise_exception=True)
         voter = models.Voter(**input_serializer.validated_data)
@@ -144,10 +143,19 @@ class StatusViewSet(viewsets.ViewSetMixin, generics.ListAPIView):
             }
             status = 200
 
-        if status < 400:
-            key = CachedThrottle.get_key(request, self)
-            cache.set(key, (data, status), settings.API_CACHE_SECONDS)
-        return Response(data, status)
+        headers = _get_freshness(registration_status)
+        return Response(data, status, headers=headers)
+
+
+def _count_items(model):
+    items = (
+        model.objects.filter(election=OuterRef("pk"))
+        .order_by()
+        .values("election")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(items, output_field=IntegerField()), 0)
 
 
 class ElectionViewSet(viewsets.ModelViewSet):
@@ -162,7 +170,10 @@ class ElectionViewSet(viewsets.ModelViewSet):
     """
 
     http_method_names = ["options", "get"]
-    queryset = models.Election.objects.all()
+    queryset = models.Election.objects.annotate(
+        proposals_count=_count_items(models.Proposal),
+        positions_count=_count_items(models.Position),
+    )
     filter_backends = [filters.DjangoFilterBackend]
     filterset_class = filters.ElectionFilter
     serializer_class = serializers.ElectionSerializer
@@ -231,7 +242,7 @@ class BallotViewSet(viewsets.ModelViewSet):
 
     http_method_names = ["options", "get"]
     queryset = models.Ballot.objects.select_related(
-        "election", "precinct", "precinct__county", "precinct__jurisdiction", "website"
+        "election", "precinct", "precinct__county", "precinct__jurisdiction"
     ).order_by("-election__date")
     filter_backends = [filters.DjangoFilterBackend]
     filterset_class = filters.BallotFilter
@@ -341,15 +352,7 @@ class GlossaryViewSet(viewsets.ViewSet):
     serializer_class = serializers.GlossarySerializer
 
     def list(self, request):
-        items: list = []
-
-        items.extend(models.DistrictCategory.objects.all())
-
-        positions: set[str] = set()
-        for position in models.Position.objects.all():
-            if position.name not in positions:
-                positions.add(position.name)
-                items.append(position)
-
-        serializer = self.serializer_class(items, many=True)
-        return Response(serializer.data)
+        etag, data = cache.get(GLOSSARY_CACHE_KEY) or update_glossary()
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status=304, headers={"ETag": etag})
+        return Response(data, headers={"ETag": etag})
@@ -1,4 +1,15 @@
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import log
+import pytest
+from django.utils import timezone
+
+from elections import helpers, models
+
+from . import factories
 
 
 def pytest_configure(config):
@@ -10,3 +21,70 @@ def pytest_configure(config):
 
     terminal = config.pluginmanager.getplugin("terminal")
     terminal.TerminalReporter.showfspath = False
+
+
+class MVICHandler(BaseHTTPRequestHandler):
+    """Stub MVIC website serving unavailable ballots with a fixed latency.
+
+    Ballot HTML can be served for specific paths by adding it to ``ballots``.
+    """
+
+    protocol_version = "HTTP/1.1"
+    delay = 0.05
+    html = '<div id="PreviewMvicBallot">Ballot is not available at this time.</div>'
+
+    def do_GET(self):
+        self.server.paths.append(self.path)  # type: ignore[attr-defined]
+        time.sleep(self.delay)
+
+        etag = self.server.etag  # type: ignore[attr-defined]
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        ballots = self.server.ballots  # type: ignore[attr-defined]
+        body = ballots.get(self.path, self.html).encode()
+        self.send_response(200)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def mvic_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MVICHandler)
+    server.paths = []  # type: ignore[attr-defined]
+    server.etag = None  # type: ignore[attr-defined]
+    server.ballots = {}  # type: ignore[attr-defined]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    host, port = server.server_address[:2]
+    monkeypatch.setattr(helpers, "MVIC_URL", f"http://{host}:{port}")
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def recurring_elections(db):
+    """Three years of elections sharing the same positions and proposal."""
+    elections = []
+    for year in [2018, 2019, 2020]:
+        election = factories.ElectionFactory.create(
+            date=timezone.make_aware(datetime(year, 8, 7))
+        )
+        for name in ["Governor", "Mayor"]:
+            factories.PositionFactory.create(election=election, name=name)
+        models.Proposal.objects.create(election=election, name="Proposal 1")
+        elections.append(election)
+    return elections
@@ -61,6 +61,8 @@ class BallotFactory(factory.django.DjangoModelFactory):
     precinct = factory.SubFactory(PrecinctFactory)
 
     website = factory.SubFactory(BallotWebsiteFactory)
+    mvic_election_id = factory.LazyAttribute(lambda o: o.website.mvic_election_id)
+    mvic_precinct_id = factory.LazyAttribute(lambda o: o.website.mvic_precinct_id)
 
 
 class PositionFactory(factory.django.DjangoModelFactory):
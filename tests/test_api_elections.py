@@ -32,3 +32,17 @@ def describe_list():
 
         expect(response.status_code) == 200
         expect(response.data["count"]) == 2
+
+    def it_counts_ballot_items_in_constant_queries(
+        expect, client, url, django_assert_num_queries, recurring_elections
+    ):
+        with django_assert_num_queries(2):
+            response = client.get(url + "?active=all")
+
+        expect(response.status_code) == 200
+        expect(
+            [
+                (election["positions_count"], election["proposals_count"])
+                for election in response.data["results"]
+            ]
+        ) == [(2, 1)] * 3
@@ -23,3 +23,25 @@ def describe_list():
                 "edit_url": "https://github.com/citizenlabsgr/elections-api/edit/main/content/districts/Foobar.md",
             }
         ]
+
+    def it_includes_each_position_name_once(expect, client, url, recurring_elections):
+        response = client.get(url)
+
+        names = [item["name"] for item in response.data]
+        expect(names.count("Mayor")) == 1
+
+    def it_reads_the_glossary_in_constant_queries(
+        expect, client, url, recurring_elections, django_assert_num_queries
+    ):
+        with django_assert_num_queries(2):
+            client.get(url)
+
+    def it_returns_not_modified_for_a_matching_etag(expect, client, url, db):
+        DistrictCategory.objects.create(name="Foobar", description="TBD")
+
+        response = client.get(url)
+        etag = response["ETag"]
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        expect(response.status_code) == 304
+        expect(response["ETag"]) == etag
@@ -6,6 +6,9 @@ from unittest.mock import Mock, patch
 import pytest
 import time_machine
 from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from elections import defaults, exceptions
@@ -86,6 +89,25 @@ def describe_create():
             },
         }
 
+    @time_machine.travel("2024-06-08")
+    def it_reads_the_ballot_without_its_website(expect, client, url, vcr, ballot):
+        defaults.initialize_districts()
+        ballot.item_count = 32
+        ballot.save()
+
+        with vcr.use_cassette("it_returns_data_for_a_registered_voter.yaml"):
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(
+                    url + "?first_name=Rosalynn"
+                    "&last_name=Bliss"
+                    "&birth_date=1975-08-03"
+                    "&zip_code=49503"
+                )
+
+        expect(response.data["ballot"]["items"]) == 32
+        queries = " ".join(query["sql"] for query in context.captured_queries)
+        expect(queries).excludes("elections_ballotwebsite")
+
     @pytest.mark.vcr
     @time_machine.travel("2024-06-08")
     def it_handles_unknown_voters(expect, client, url, election):
@@ -166,3 +188,32 @@ def describe_create():
             },
             "ballot": {},
         }
+
+    @override_settings(API_CACHE_SECONDS=60)
+    @time_machine.travel("2024-06-08")
+    def it_shares_cached_lookups_with_registrations(
+        expect, client, url, election, shared_cache
+    ):
+        with patch(
+            "elections.helpers.fetch_registration_status_data",
+            Mock(return_value={"registered": False}),
+        ) as fetch:
+            client.get(
+                "/api/registrations/?first_name=Jane"
+                "&last_name=Doe"
+                "&birth_date=2000-01-01"
+                "&zip_code=49503"
+            )
+            response = client.get(
+                url + "?zip_code=49503"
+                "&birth_date=2000-01-15"
+                "&last_name=DOE"
+                "&first_name=jane"
+                "&utm_source=newsletter"
+            )
+
+        expect(response.status_code) == 200
+        expect(response.data["status"]["registered"]) == False
+        expect(fetch.call_count) == 1
+        expect(response["Age"]) == "0"
+        expect(response).contains("Last-Modified")
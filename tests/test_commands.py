@@ -1,13 +1,27 @@
 # pylint: disable=unused-argument,unused-variable
 
 
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
 
+import log
 import pytest
+import yaml
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
-from elections import commands, defaults
-from elections.models import Ballot, BallotWebsite, District, Election
+from elections import commands, defaults, helpers
+from elections.models import (
+    Ballot,
+    BallotHTML,
+    BallotWebsite,
+    CrawlState,
+    District,
+    Election,
+)
 
 
 @pytest.fixture
@@ -39,6 +53,37 @@ def describe_update_elections():
         past_election.refresh_from_db()
         expect(past_election.active) == False
 
+    def it_deletes_invalid_ballot_websites(expect, past_election):
+        past_election.active = True
+        past_election.save()
+        BallotWebsite.objects.bulk_create(
+            BallotWebsite(
+                mvic_election_id=election_id, mvic_precinct_id=i, valid=i > 10
+            )
+            for election_id in [681, 699]
+            for i in range(1, 21)
+        )
+
+        commands.update_elections()
+
+        expect(BallotWebsite.objects.filter(mvic_election_id=681).count()) == 10
+        expect(BallotWebsite.objects.filter(valid=False).count()) == 10
+
+    def it_deletes_unreferenced_ballot_html(expect, past_election):
+        kept, orphaned = [
+            BallotHTML.compress(html) for html in ["<p>1</p>", "<p>2</p>"]
+        ]
+        BallotHTML.objects.bulk_create([kept, orphaned])
+        BallotWebsite.objects.create(
+            mvic_election_id=681, mvic_precinct_id=1, mvic_content=kept
+        )
+
+        commands.update_elections()
+
+        expect(list(BallotHTML.objects.values_list("digest", flat=True))) == [
+            kept.digest
+        ]
+
 
 def describe_scrape_ballots():
     @pytest.mark.vcr
@@ -58,6 +103,207 @@ def describe_scrape_ballots():
         expect(Election.objects.count()) == 2
         expect(BallotWebsite.objects.count()) == 1
 
+    def with_concurrent_workers(expect, active_election, mvic_server):
+        durations = {}
+        for workers in [1, 10]:
+            BallotWebsite.objects.all().delete()
+            mvic_server.paths.clear()
+
+            start = time.monotonic()
+            commands.scrape_ballots(
+                max_election_error_count=1, max_ballot_error_count=40, workers=workers
+            )
+            durations[workers] = time.monotonic() - start
+
+            expect(BallotWebsite.objects.filter(fetched=True).count()) == 40
+            expect(BallotWebsite.objects.filter(valid=False).count()) == 40
+            expect(len(mvic_server.paths)) >= 40
+
+        log.info(
+            f"Scraped 40 ballots in {durations[1]:.2f}s with 1 worker"
+            f" and {durations[10]:.2f}s with 10 workers"
+        )
+
+    @pytest.mark.parametrize("etag", [None, '"abc123"'])
+    def it_skips_unchanged_ballots(expect, active_election, mvic_server, etag):
+        mvic_server.etag = etag
+        commands.scrape_ballots(
+            ballot_limit=1, max_election_error_count=1, max_ballot_error_count=10
+        )
+
+        with patch.object(BallotWebsite, "validate") as validate:
+            commands.scrape_ballots(
+                ballot_limit=1, max_election_error_count=1, max_ballot_error_count=10
+            )
+
+        expect(len(mvic_server.paths)) == 20
+        expect(validate.called) == False
+        websites = BallotWebsite.objects.filter(valid=False, mvic_etag=etag or "")
+        expect(websites.count()) == 10
+
+    def it_reuses_connections(expect, active_election, mvic_server):
+        before = helpers.get_session_stats()
+
+        commands.scrape_ballots(max_election_error_count=1, max_ballot_error_count=10)
+
+        after = helpers.get_session_stats()
+        expect(after["requests"] - before["requests"]) == 10
+        expect(after["connections"] - before["connections"]) == 1
+
+    def it_loads_websites_in_blocks(expect, active_election, mvic_server):
+        BallotWebsite.objects.bulk_create(
+            BallotWebsite(mvic_election_id=682, mvic_precinct_id=precinct_id)
+            for precinct_id in range(1, 51)
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            commands.scrape_ballots(
+                max_election_error_count=1, max_ballot_error_count=250, workers=10
+            )
+
+        expect(BallotWebsite.objects.filter(fetched=True).count()) == 250
+        queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if '"elections_ballotwebsite"' in query["sql"]
+        ]
+        expect(len(queries)) < 25
+
+    def it_resumes_an_interrupted_crawl(expect, active_election, mvic_server):
+        CrawlState.objects.create(
+            task=CrawlState.SCRAPE,
+            mvic_election_id=682,
+            last_precinct_id=100,
+            error_count=5,
+        )
+
+        commands.scrape_ballots(max_election_error_count=1, max_ballot_error_count=10)
+
+        expect(mvic_server.paths[0]) == "/Voter/GetMvicBallot/101/682/"
+        expect(len(mvic_server.paths)) == 5
+        state = CrawlState.objects.get(task=CrawlState.SCRAPE, mvic_election_id=682)
+        expect(state.last_precinct_id) == 105
+        expect(state.finished) != None
+
+    def it_tolerates_websites_created_by_an_overlapping_crawl(
+        expect, active_election, mvic_server, monkeypatch
+    ):
+        bulk_create = BallotWebsite.objects.bulk_create
+
+        def overlap(websites, **kwargs):
+            if not BallotWebsite.objects.exists():
+                BallotWebsite.objects.create(mvic_election_id=682, mvic_precinct_id=1)
+            return bulk_create(websites, **kwargs)
+
+        monkeypatch.setattr(BallotWebsite.objects, "bulk_create", overlap)
+
+        commands.scrape_ballots(max_election_error_count=1, max_ballot_error_count=10)
+
+        expect(mvic_server.paths[0]) == "/Voter/GetMvicBallot/1/682/"
+        expect(len(mvic_server.paths)) == 10
+
+    def it_ignores_interrupted_probes_for_unknown_elections(
+        expect, active_election, mvic_server
+    ):
+        CrawlState.objects.create(
+            task=CrawlState.SCRAPE,
+            mvic_election_id=683,
+            last_precinct_id=100,
+            error_count=5,
+        )
+
+        commands.scrape_ballots(max_election_error_count=1, max_ballot_error_count=10)
+
+        expect(mvic_server.paths[0]) == "/Voter/GetMvicBallot/1/682/"
+
+    def it_restarts_an_interrupted_discovery_from_the_first_precinct(
+        expect, active_election, mvic_server
+    ):
+        CrawlState.objects.create(
+            task=CrawlState.SCRAPE,
+            mvic_election_id=682,
+            last_precinct_id=32768,
+            error_count=5,
+            discovering=True,
+        )
+
+        commands.scrape_ballots(max_election_error_count=1, max_ballot_error_count=10)
+
+        expect(mvic_server.paths[0]) == "/Voter/GetMvicBallot/1/682/"
+        expect(len(mvic_server.paths)) == 10
+        state = CrawlState.objects.get(task=CrawlState.SCRAPE, mvic_election_id=682)
+        expect(state.discovering) == False
+
+    def it_discovers_precincts_from_previous_elections(
+        expect, db, mvic_server, monkeypatch
+    ):
+        monkeypatch.setattr(mvic_server.RequestHandlerClass, "delay", 0)
+        path = (
+            Path(__file__).parent / "cassettes" / "test_parse_ballot[698-4316-32].yaml"
+        )
+        cassette = yaml.safe_load(path.read_text())
+        html = cassette["interactions"][0]["response"]["body"]["string"]
+        name, date = helpers.parse_election(html)
+        Election.objects.create(name=name, date=datetime(*date), mvic_id=698)
+        defaults.initialize_districts()
+
+        BallotWebsite.objects.bulk_create(
+            BallotWebsite(
+                mvic_election_id=697, mvic_precinct_id=precinct_id, valid=True
+            )
+            for precinct_id in [*range(1, 21), *range(201, 221)]
+        )
+        valid = [*range(1, 26), *range(100, 141), *range(201, 221), *range(380, 401)]
+        for precinct_id in valid:
+            mvic_server.ballots[f"/Voter/GetMvicBallot/{precinct_id}/698/"] = html
+
+        commands.scrape_ballots(
+            max_election_error_count=1,
+            max_ballot_error_count=500,
+            workers=10,
+            discover=True,
+        )
+
+        websites = BallotWebsite.objects.filter(mvic_election_id=698, valid=True)
+        expect(sorted(websites.values_list("mvic_precinct_id", flat=True))) == valid
+        paths = [url for url in mvic_server.paths if url.endswith("/698/")]
+        sequential = valid[-1] + 500
+        expect(len(paths)) < sequential / 3
+        state = CrawlState.objects.get(task=CrawlState.SCRAPE, mvic_election_id=698)
+        expect(state.discovering) == True
+        expect(state.last_precinct_id) == 0
+
+
+def describe_refresh_ballots():
+    def it_refetches_the_most_overdue_ballots(expect, active_election, mvic_server):
+        now = timezone.now()
+        BallotWebsite.objects.bulk_create(
+            BallotWebsite(
+                mvic_election_id=682,
+                mvic_precinct_id=precinct_id,
+                fetched=True,
+                last_fetch=now - timedelta(days=7),
+                refresh_due=now + timedelta(hours=hours),
+            )
+            for precinct_id, hours in [(1, -1), (2, -3), (3, 1), (4, -2), (5, -4)]
+        )
+
+        count = commands.refresh_ballots(budget=3)
+
+        expect(count) == 3
+        expect(mvic_server.paths) == [
+            "/Voter/GetMvicBallot/5/682/",
+            "/Voter/GetMvicBallot/2/682/",
+            "/Voter/GetMvicBallot/4/682/",
+        ]
+        websites = BallotWebsite.objects.filter(refresh_due__gt=now)
+        expect(sorted(websites.values_list("mvic_precinct_id", flat=True))) == [
+            2,
+            3,
+            4,
+            5,
+        ]
+
 
 def describe_parse_ballots():
     @pytest.mark.vcr
@@ -82,3 +328,44 @@ def describe_parse_ballots():
 
         expect(Ballot.objects.count()) == 1
         expect(District.objects.count()) == 7
+
+    def describe_with_parsing_processes():
+        @pytest.fixture
+        def vcr_cassette_name():
+            return "with_active_election_and_one_scrapped_ballot"
+
+        @pytest.mark.vcr
+        def it_matches_parsing_in_the_crawler(expect, active_election):
+            defaults.initialize_districts()
+            defaults.initialize_parties()
+
+            commands.scrape_ballots(
+                starting_precinct_id=1828, ballot_limit=1, processes=1
+            )
+            commands.parse_ballots()
+
+            expect(Ballot.objects.count()) == 1
+            expect(District.objects.count()) == 7
+
+    def describe_with_workers():
+        @pytest.mark.django_db(transaction=True)
+        def it_parses_precinct_ranges_in_processes(expect, vcr):
+            defaults.initialize_districts()
+            defaults.initialize_parties()
+            for precinct_id, item_count in [(4316, 32), (4321, 41), (49195, 32)]:
+                with vcr.use_cassette(
+                    f"test_parse_ballot[698-{precinct_id}-{item_count}].yaml"
+                ):
+                    website = BallotWebsite.objects.create(
+                        mvic_election_id=698, mvic_precinct_id=precinct_id
+                    )
+                    website.fetch()
+                website.validate()
+                website.scrape()
+                website.convert()
+
+            commands.parse_ballots(election_id=698, workers=2)
+
+            expect(BallotWebsite.objects.filter(parsed=True).count()) == 3
+            for ballot in Ballot.objects.all():
+                expect(ballot.position_set.count()) > 0
@@ -0,0 +1,57 @@
+# pylint: disable=unused-argument,unused-variable
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from elections.models import Ballot, BallotWebsite, Election, Position, Proposal
+
+QUERIES = {
+    "parse": lambda: BallotWebsite.objects.filter(
+        mvic_election_id=698, valid=True
+    ).order_by("mvic_precinct_id"),
+    "purge": lambda: BallotWebsite.objects.filter(mvic_election_id=698, valid=False),
+    "refresh": lambda: BallotWebsite.objects.filter(
+        mvic_election_id__in=[698], fetched=True, refresh_due__lte=timezone.now()
+    ).order_by("refresh_due"),
+    "registration": lambda: Ballot.objects.filter(
+        mvic_election_id=698, mvic_precinct_id=4316
+    ),
+    "elections": lambda: Election.objects.filter(active=True),
+    "positions": lambda: Position.objects.filter(election__active=True, precincts=1),
+    "proposals": lambda: Proposal.objects.filter(election__active=True, precincts=1),
+}
+
+FILTERED_QUERIES = {"parse", "purge", "refresh", "registration"}
+
+
+@pytest.fixture
+def websites(db):
+    now = timezone.now()
+    BallotWebsite.objects.bulk_create(
+        BallotWebsite(
+            mvic_election_id=election_id,
+            mvic_precinct_id=precinct_id,
+            fetched=True,
+            valid=precinct_id % 3 == 0,
+            refresh_due=now + timedelta(hours=precinct_id % 48 - 24),
+        )
+        for election_id in range(695, 699)
+        for precinct_id in range(1, 1001)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE elections_ballotwebsite")
+
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_query_plan(expect, websites, name):
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+
+    plan = QUERIES[name]().explain()
+
+    expect(plan).excludes("Seq Scan")
+    if name in FILTERED_QUERIES:
+        expect(plan).excludes("Filter:")
@@ -1,11 +1,35 @@
 # pylint: disable=unused-argument,unused-variable
 
+import gzip
+import time
+from pathlib import Path
+from unittest.mock import patch
 
 import log
 import pytest
-
-from elections import defaults
-from elections.models import BallotWebsite, Candidate, Position, Proposal
+import yaml
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from elections import defaults, helpers
+from elections.models import BallotWebsite, Candidate, ParseCache, Position, Proposal
+
+
+@pytest.fixture(scope="module")
+def ballot_pages() -> list[tuple[str, str]]:
+    pages = []
+    root = Path(__file__).parents[1]
+    for path in sorted(root.glob("*/**/cassettes/*.yaml")):
+        for interaction in yaml.safe_load(path.read_text())["interactions"]:
+            url = interaction["request"]["uri"]
+            body = interaction["response"]["body"]["string"]
+            if isinstance(body, bytes):
+                body = gzip.decompress(body) if body[:2] == b"\x1f\x8b" else body
+                body = body.decode()
+            if "GetMvicBallot" in url and "PreviewMvicBallot" in body:
+                pages.append((url, body))
+    return pages
 
 
 def parse_ballot(election_id: int, precinct_id: int) -> int:
@@ -149,3 +173,66 @@ def test_court_of_appeals_incumbency(expect, db):
     for position in positions:
         log.info(position)
     expect(len(positions)) == 3
+
+
+@pytest.mark.django_db
+def test_cached_ballot_items(expect, settings, vcr):
+    settings.BALLOT_CACHE_SECONDS = 60
+    cache.clear()
+    with vcr.use_cassette("test_parse_ballot[695-4190-4].yaml"):
+        url = "https://mvic.sos.state.mi.us/Voter/GetMvicBallot/4190/695/"
+        html = helpers.fetch_ballot_html(url)[0]
+    other_html = html.replace("Precinct 1 &nbsp;", "Precinct 2 &nbsp;")
+
+    with patch.object(helpers, "parse_ballot", wraps=helpers.parse_ballot) as parse:
+        data, count = helpers.parse_website(html, url)
+        other_data, other_count = helpers.parse_website(other_html, url)
+
+    expect(parse.call_count) == 1
+    expect(other_count) == count == 4
+    expect(other_data["ballot"]) == data["ballot"]
+    expect(other_data["precinct"]) != data["precinct"]
+
+
+def test_parser_backends(expect, settings, ballot_pages):
+    settings.HTML_PARSER = "html.parser"
+    start = time.perf_counter()
+    expected = []
+    for url, html in ballot_pages:
+        ballot: dict = {}
+        count = helpers.parse_ballot(html, ballot)
+        election = helpers.parse_election(html)
+        expected.append((election, ballot, count))
+    baseline = time.perf_counter() - start
+
+    settings.HTML_PARSER = "lxml"
+    start = time.perf_counter()
+    actual = []
+    for url, html in ballot_pages:
+        data, count = helpers.parse_website(html, url)
+        actual.append((data["election"], data["ballot"], count))
+    duration = time.perf_counter() - start
+
+    log.info(f"Parsed {len(ballot_pages)} ballots in {duration:.2f}s ({baseline:.2f}s)")
+    expect(len(ballot_pages)) >= 30
+    expect(actual) == expected
+
+
+def test_parse_cache(expect, db, vcr):
+    with vcr.use_cassette("test_parse_ballot[699-240-75].yaml"):
+        expect(parse_ballot(699, 240)) == 75
+    website = BallotWebsite.objects.get(mvic_election_id=699, mvic_precinct_id=240)
+    ballot = website.ballot
+    cache = ParseCache(ballot.election)
+
+    with CaptureQueriesContext(connection) as uncached:
+        expect(ballot.parse()) == 75
+    position_count = ballot.position_set.count()
+    ballot.position_set.clear()
+    with CaptureQueriesContext(connection) as cached:
+        expect(ballot.parse(cache)) == 75
+        cache.flush()
+    expect(ballot.position_set.count()) == position_count == 25
+
+    log.info(f"Parsed ballot with {len(cached)} queries ({len(uncached)} uncached)")
+    expect(len(cached)) < len(uncached) / 2